@@ -0,0 +1,305 @@
+"""Synthetic Magisto-like site for benchmarks (no network, no account needed)
+
+Serves:
+  /video/mine          library page, first page of video cards, infinite scroll via /api/library
+  /api/library?page=N  JSON page of videos (what the real web app fetches while scrolling)
+  /video/<id>          video page with title, Download span and optional confirmation popup
+  /media/<id>.mp4      video file of configurable size (Range and HEAD supported)
+  /thumb/<id>.jpg      thumbnail
+
+Run standalone:  python benchmarks/fake_magisto_site.py --videos 200 --port 8765
+"""
+import argparse
+import html
+import json
+import struct
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Renditions offered in the download popup: (label, suffix, share of full file size)
+RENDITIONS = [("Full HD", "_FULL_HD", 1.0), ("HD", "_HD", 0.6), ("SD", "", 0.3)]
+
+LIBRARY_PAGE = """<!DOCTYPE html>
+<html><head><title>My videos - Magisto</title></head>
+<body>
+<div class="user-menu"><a href="/video/mine">My Videos</a></div>
+<div id="library">{cards}</div>
+<script>
+let nextPage = {next_page};
+let loading = false;
+window.addEventListener('scroll', async () => {{
+    if (loading || nextPage === null) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    loading = true;
+    const response = await fetch('/api/library?page=' + nextPage);
+    const data = await response.json();
+    const library = document.getElementById('library');
+    for (const video of data.items) {{
+        library.insertAdjacentHTML('beforeend', renderCard(video));
+    }}
+    nextPage = data.next_page;
+    loading = false;
+}});
+function renderCard(video) {{
+    return '<div class="movie-card" style="height:220px">' +
+        '<a data-test-id="movie-card" href="/video/' + video.hash + '">' +
+        '<img src="' + video.thumbnail + '" width="160" height="90">' +
+        '<span class="card-title">' + video.title + '</span></a>' +
+        '<span class="duration">' + video.duration + '</span></div>';
+}}
+</script>
+</body></html>"""
+
+CARD = ('<div class="movie-card" style="height:220px">'
+        '<a data-test-id="movie-card" href="/video/{hash}">'
+        '<img src="{thumbnail}" width="160" height="90">'
+        '<span class="card-title">{title}</span></a>'
+        '<span class="duration">{duration}</span></div>')
+
+VIDEO_PAGE = """<!DOCTYPE html>
+<html><head><title>{title} - Magisto</title></head>
+<body>
+<div class="user-menu"><a href="/video/mine">My Videos</a></div>
+<div class="video-widget">
+  <h1>{title}</h1>
+  <video preload="none" src="/media/{hash}.mp4" width="640" height="360"></video>
+  <div class="actions"><span id="download" class="download">Download</span></div>
+</div>
+<div id="popup" class="modal" style="display:none">
+  <p>Choose quality</p>
+  {rendition_buttons}
+</div>
+<script>
+function startDownload(url) {{
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = '';
+    document.body.appendChild(link);
+    link.click();
+    document.getElementById('popup').style.display = 'none';
+}}
+document.getElementById('download').addEventListener('click', () => {{
+    if ({popup}) {{
+        setTimeout(() => document.getElementById('popup').style.display = 'block', {popup_delay});
+    }} else {{
+        startDownload('/media/{hash}.mp4');
+    }}
+}});
+</script>
+</body></html>"""
+
+RENDITION_BUTTON = ('<button class="rendition" data-size="{size}" '
+                    'onclick="startDownload(\'/media/{hash}.mp4?quality={quality}\')">'
+                    'Download {label} ({size_mb:.1f} MB)</button>')
+
+NOT_FOUND_PAGE = "<!DOCTYPE html><html><head><title>Page not Found</title></head><body><h1>Page not Found</h1></body></html>"
+
+
+def mp4_box(box_type, body):
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def build_mp4(size, tag=b""):
+    """Structurally valid MP4 (ftyp + moov + mdat) of exactly `size` bytes
+
+    `tag` is stored in moov/udta so every video has different content (and hash).
+    """
+    ftyp = struct.pack(">I4s4sI4s4s", 24, b"ftyp", b"isom", 0x200, b"isom", b"mp41")
+    trak = mp4_box(b"trak", mp4_box(b"tkhd", b"\x00" * 84))
+    moov = mp4_box(b"moov", mp4_box(b"mvhd", b"\x00" * 100) + trak + mp4_box(b"udta", tag))
+    header = ftyp + moov
+    mdat_size = max(8, size - len(header))
+    return header + struct.pack(">I4s", mdat_size, b"mdat"), mdat_size - 8
+
+
+class FakeMagistoSite:
+    """Configurable fake site running in a background thread"""
+
+    def __init__(self, videos=100, page_size=24, file_size=2 * 1024 * 1024, popup_every=5,
+                 popup_delay_ms=300, latency_ms=0, port=0):
+        self.videos = [
+            {
+                "hash": f"BENCH{i:06d}X",
+                "title": f"Benchmark video number {i} from the fake library",
+                "duration": f"0:{i % 60:02d}",
+                "created_at": f"2024-{(i % 12) + 1:02d}-01T10:00:00Z",
+                "thumbnail": f"/thumb/BENCH{i:06d}X.jpg",
+            }
+            for i in range(1, videos + 1)
+        ]
+        self.by_hash = {video["hash"]: (index, video) for index, video in enumerate(self.videos)}
+        self.page_size = page_size
+        self.file_size = file_size
+        self.popup_every = popup_every
+        self.popup_delay_ms = popup_delay_ms
+        self.latency = latency_ms / 1000
+        self.requests = {}  # path prefix -> request count
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-magisto", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count_request(self, path):
+        prefix = "/" + path.strip("/").split("/")[0]
+        with self._lock:
+            self.requests[prefix] = self.requests.get(prefix, 0) + 1
+
+    def library_page(self, page):
+        start = page * self.page_size
+        items = self.videos[start:start + self.page_size]
+        next_page = page + 1 if start + self.page_size < len(self.videos) else None
+        return items, next_page
+
+    def media_name(self, video, suffix):
+        # Magisto truncates long titles to ~20 characters and adds quality suffix
+        return f"{video['title'][:20]}{suffix}.mp4"
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self.handle_request(head=True)
+
+            def do_GET(self):
+                self.handle_request(head=False)
+
+            def send_body(self, status, body, content_type, head=False, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def handle_request(self, head):
+                if site.latency:
+                    time.sleep(site.latency)
+                url = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(url.query)
+                path = url.path.rstrip("/") or "/"
+                site.count_request(path)
+
+                if path in ("/", "/connect", "/video/mine"):
+                    items, next_page = site.library_page(0)
+                    cards = "".join(CARD.format(**{k: html.escape(v) for k, v in video.items()}) for video in items)
+                    body = LIBRARY_PAGE.format(cards=cards, next_page=json.dumps(next_page))
+                    return self.send_body(200, body.encode(), "text/html; charset=utf-8", head)
+
+                if path == "/api/library":
+                    page = int(query.get("page", ["0"])[0])
+                    items, next_page = site.library_page(page)
+                    body = json.dumps({"items": items, "page": page, "next_page": next_page})
+                    return self.send_body(200, body.encode(), "application/json", head)
+
+                parts = path.strip("/").split("/")
+                if len(parts) == 2 and parts[0] == "video" and parts[1] in site.by_hash:
+                    index, video = site.by_hash[parts[1]]
+                    popup = bool(site.popup_every) and index % site.popup_every == 0
+                    buttons = "".join(
+                        RENDITION_BUTTON.format(hash=video["hash"], quality=quality, label=label,
+                                                size=int(site.file_size * share),
+                                                size_mb=site.file_size * share / (1024 ** 2))
+                        for quality, (label, _, share) in enumerate(RENDITIONS))
+                    body = VIDEO_PAGE.format(title=html.escape(video["title"]), hash=video["hash"],
+                                             popup="true" if popup else "false",
+                                             popup_delay=site.popup_delay_ms, rendition_buttons=buttons)
+                    return self.send_body(200, body.encode(), "text/html; charset=utf-8", head)
+
+                if len(parts) == 2 and parts[0] == "media" and parts[1].endswith(".mp4"):
+                    entry = site.by_hash.get(parts[1][:-4])
+                    if entry:
+                        quality = min(int(query.get("quality", ["0"])[0]), len(RENDITIONS) - 1)
+                        _, suffix, share = RENDITIONS[quality]
+                        return self.send_media(entry[1], int(site.file_size * share), suffix, head)
+
+                if len(parts) == 2 and parts[0] == "thumb":
+                    return self.send_body(200, b"\xff\xd8\xff\xe0" + b"\x00" * 2048, "image/jpeg", head)
+
+                self.send_body(404, NOT_FOUND_PAGE.encode(), "text/html; charset=utf-8", head)
+
+            def send_media(self, video, size, suffix, head):
+                header, payload_size = build_mp4(size, f"{video['hash']}{suffix}".encode())
+                total = len(header) + payload_size
+                start = 0
+                status = 200
+                range_header = self.headers.get("Range")
+                if range_header and range_header.startswith("bytes="):
+                    start = int(range_header[6:].split("-")[0] or 0)
+                    if start >= total:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{total}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status = 206
+
+                filename = urllib.parse.quote(site.media_name(video, suffix))
+                self.send_response(status)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(total - start))
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{filename}")
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+                self.end_headers()
+                if head:
+                    return
+
+                position = start
+                if position < len(header):
+                    self.wfile.write(header[position:])
+                    position = len(header)
+                chunk = b"\x00" * (256 * 1024)
+                while position < total:
+                    size_left = min(len(chunk), total - position)
+                    self.wfile.write(chunk[:size_left])
+                    position += size_left
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Magisto site for benchmarks")
+    parser.add_argument("--videos", type=int, default=100, help="library size")
+    parser.add_argument("--page-size", type=int, default=24, help="videos per infinite-scroll page")
+    parser.add_argument("--file-size", type=int, default=2 * 1024 * 1024, help="bytes per video file")
+    parser.add_argument("--popup-every", type=int, default=5, help="every N-th video shows confirmation popup (0 = never)")
+    parser.add_argument("--latency-ms", type=int, default=0, help="added delay per request")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    site = FakeMagistoSite(videos=args.videos, page_size=args.page_size, file_size=args.file_size,
+                           popup_every=args.popup_every, latency_ms=args.latency_ms, port=args.port).start()
+    print(f"Fake Magisto site running at {site.base_url}/video/mine (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
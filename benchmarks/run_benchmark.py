@@ -0,0 +1,155 @@
+"""Run magisto_downloader.py end-to-end against the fake site and report performance numbers
+
+Every run happens in a fresh temp directory (empty download folder, new state database),
+so results are comparable from run to run:
+
+    python benchmarks/run_benchmark.py --videos 50 --output before.json
+    ... change code ...
+    python benchmarks/run_benchmark.py --videos 50 --compare before.json
+
+Any MAGISTO_* setting can be passed through with --env, e.g. --env PARALLEL_WORKERS=2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_magisto_site import FakeMagistoSite
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_DIR, "magisto_downloader.py")
+
+# (key, label, True if higher is better)
+REPORT_FIELDS = [
+    ("videos_per_minute", "Videos/min", True),
+    ("page_loads_per_video", "Page loads per video", False),
+    ("webdriver_commands_per_video", "WebDriver commands per video", False),
+    ("idle_seconds", "Total idle time (s)", False),
+    ("crawl_seconds", "Crawl time (s)", False),
+    ("wall_seconds", "Wall time (s)", False),
+    ("files_downloaded", "Files downloaded", True),
+]
+
+
+def run_once(args, site):
+    """Run the downloader once in a clean working directory, return computed results"""
+    work_dir = tempfile.mkdtemp(prefix="magisto_bench_")
+    download_dir = os.path.join(work_dir, "downloads")
+    os.makedirs(download_dir)
+    metrics_file = os.path.join(work_dir, "metrics.json")
+    cookie_file = os.path.join(work_dir, "cookies.json")
+
+    # The fake site accepts any session - a saved cookie skips the login flow
+    with open(cookie_file, "w", encoding="utf-8") as f:
+        json.dump([{"name": "session", "value": "benchmark", "path": "/"}], f)
+
+    env = dict(os.environ)
+    env.update({
+        "MAGISTO_BASE_URL": site.base_url,
+        "MAGISTO_DOWNLOAD_DIR": download_dir,
+        "MAGISTO_COOKIE_JAR_FILE": cookie_file,
+        "MAGISTO_METRICS_JSON_FILE": metrics_file,
+        "MAGISTO_LEAN_BROWSER": "1" if args.lean else "0",
+        "MAGISTO_TIMING_PROFILE": args.timing,
+    })
+    for item in args.env:
+        name, _, value = item.partition("=")
+        env[f"MAGISTO_{name}"] = value
+
+    started = time.time()
+    result = subprocess.run([sys.executable, SCRIPT], cwd=work_dir, env=env,
+                            stdin=subprocess.DEVNULL, capture_output=not args.verbose, text=True)
+    wall_seconds = time.time() - started
+    if result.returncode != 0:
+        print(f"⚠️ Downloader exited with code {result.returncode}")
+        if result.stderr:
+            print(result.stderr[-2000:])
+
+    try:
+        with open(metrics_file, "r", encoding="utf-8") as f:
+            run_metrics = json.load(f)
+    except (OSError, ValueError):
+        raise SystemExit(f"No metrics written to {metrics_file} - see log in {work_dir}")
+
+    counters = run_metrics.get("counters", {})
+    histograms = run_metrics.get("histograms", {})
+    videos = max(1, counters.get("videos_found", 0))
+    run_seconds = run_metrics.get("elapsed_seconds", wall_seconds)
+    # Organized layouts keep videos in subfolders
+    files = [name for _, _, names in os.walk(download_dir) for name in names if name.endswith(".mp4")]
+
+    return {
+        "videos": counters.get("videos_found", 0),
+        "videos_per_minute": round(counters.get("videos_found", 0) / run_seconds * 60, 2),
+        "page_loads_per_video": round(counters.get("page_loads", 0) / videos, 2),
+        "webdriver_commands_per_video": round(counters.get("webdriver_commands", 0) / videos, 1),
+        "idle_seconds": round(counters.get("idle_seconds", 0), 2),
+        "crawl_seconds": round(histograms.get("crawl_seconds", {}).get("sum", 0), 2),
+        "wall_seconds": round(wall_seconds, 2),
+        "files_downloaded": len(files),
+        "site_requests": dict(site.requests),
+        "metrics": run_metrics,
+        "work_dir": work_dir,
+    }
+
+
+def print_report(results, baseline=None):
+    print("\n📊 Benchmark results")
+    print("=" * 64)
+    for key, label, higher_is_better in REPORT_FIELDS:
+        line = f"{label:32} {results[key]:>10}"
+        if baseline and key in baseline:
+            before = baseline[key]
+            change = results[key] - before
+            if before:
+                better = (change > 0) == higher_is_better
+                marker = "✅" if change and better else ("❌" if change else "  ")
+                line += f"   (was {before}, {change / before * 100:+.1f}%) {marker}"
+        print(line)
+    print("=" * 64)
+    print(f"Site requests: {results['site_requests']}")
+    print(f"Run directory: {results['work_dir']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark magisto_downloader.py against a local fake site")
+    parser.add_argument("--videos", type=int, default=50, help="library size")
+    parser.add_argument("--page-size", type=int, default=24, help="videos per infinite-scroll page")
+    parser.add_argument("--file-size", type=int, default=2 * 1024 * 1024, help="bytes per video file")
+    parser.add_argument("--popup-every", type=int, default=5, help="every N-th video shows confirmation popup (0 = never)")
+    parser.add_argument("--latency-ms", type=int, default=0, help="added server delay per request")
+    parser.add_argument("--timing", default="fast", help="MAGISTO_TIMING_PROFILE for the run")
+    parser.add_argument("--no-lean", dest="lean", action="store_false", help="run with a visible, full browser")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra MAGISTO_<NAME> setting for the downloader (repeatable)")
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show downloader log output")
+    args = parser.parse_args()
+
+    site = FakeMagistoSite(videos=args.videos, page_size=args.page_size, file_size=args.file_size,
+                           popup_every=args.popup_every, latency_ms=args.latency_ms).start()
+    print(f"🧪 Fake site with {args.videos} videos at {site.base_url}")
+    try:
+        results = run_once(args, site)
+    finally:
+        site.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Magisto collector - find and download all videos from your Magisto library
+
+Importing the package has no side effects: nothing is logged, no browser is
+started and Selenium is loaded only by the modules that drive the browser
+(browser, auth, crawl, api_listing, download).
+"""
+from .config import Config
+from .index import DownloadIndex
+from .manifest import read_manifest, select_shard, write_manifest
+from .metrics import RunMetrics, metrics
+from .state import StateStore
+
+__all__ = [
+    "Config",
+    "DownloadIndex",
+    "RunMetrics",
+    "StateStore",
+    "metrics",
+    "read_manifest",
+    "select_shard",
+    "write_manifest",
+]
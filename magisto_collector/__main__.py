@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# Guard needed - verification worker processes import this module again on some platforms
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""Library listing through the JSON API of the web app - no rendering or scrolling
+
+The endpoint is found in the DevTools network log of the logged-in browser
+(needs a driver started with network_log=True) and paged through with requests.
+"""
+import json
+import logging
+import re
+import urllib.parse
+
+from .browser import get_http_session
+from .crawl import HARVEST_VIDEO_LINKS_JS, PAGE_LOAD_STATE_JS, VIDEO_LINK_SELECTORS, parse_duration
+from .locator import wait_for_page_ready, wait_until
+from .metrics import metrics
+from .urls import get_video_id_from_url, is_valid_video_url, is_video_link
+
+# Field names tried when reading API responses
+API_ID_KEYS = ["hash", "vsid", "video_id", "videoId", "id", "uid"]
+API_TITLE_KEYS = ["title", "name", "caption"]
+API_THUMBNAIL_KEYS = ["thumbnail", "thumbnail_url", "thumb", "poster", "cover", "preview"]
+API_NEXT_KEYS = ["next_page", "nextPage", "next", "next_cursor", "nextCursor"]
+API_PAGE_PARAMS = ["page", "p", "page_number", "pageNumber"]
+API_OFFSET_PARAMS = ["offset", "skip", "start", "from"]
+API_CURSOR_PARAMS = ["cursor", "after", "next", "page_token", "pageToken", "continuation"]
+# Request headers of the web app that are not replayed (requests sets its own)
+API_SKIPPED_HEADERS = {"cookie", "host", "content-length", "user-agent", "accept-encoding", "connection"}
+
+def read_json_requests(driver):
+    """GET XHR/fetch requests with JSON response from browser performance log (oldest first)"""
+    sent = {}
+    responses = []
+    for entry in driver.get_log("performance"):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent":
+            sent[params.get("requestId")] = params.get("request", {})
+        elif message.get("method") == "Network.responseReceived":
+            response = params.get("response", {})
+            if params.get("type") in ("XHR", "Fetch") and "json" in response.get("mimeType", ""):
+                responses.append((params.get("requestId"), response.get("url")))
+    
+    found = []
+    for request_id, url in responses:
+        request = sent.get(request_id, {})
+        if request.get("method", "GET") != "GET":
+            continue
+        headers = {name: value for name, value in request.get("headers", {}).items()
+                   if not name.startswith(":") and name.lower() not in API_SKIPPED_HEADERS}
+        found.append({"request_id": request_id, "url": url, "headers": headers})
+    return found
+
+def get_response_json(driver, session, request, timeout):
+    """Response body of logged request - from browser cache, or requested again"""
+    try:
+        body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request["request_id"]})
+        if not body.get("base64Encoded"):
+            return json.loads(body["body"])
+    except Exception:
+        pass  # body already evicted from browser memory
+    try:
+        response = session.get(request["url"], headers=request["headers"], timeout=timeout)
+        metrics.inc("api_requests")
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logging.debug(f"   ⚠️ {request['url']} not usable: {e}")
+        return None
+
+def find_item_list(data):
+    """Longest list of objects anywhere in JSON response - the videos of one page"""
+    best = []
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            best = data
+        children = data
+    elif isinstance(data, dict):
+        children = data.values()
+    else:
+        return best
+    
+    for child in children:
+        found = find_item_list(child)
+        if len(found) > len(best):
+            best = found
+    return best
+
+def find_id_key(items, page_urls):
+    """Item field holding video IDs (most matches with video links on page): (key, matches)"""
+    best_key, best_matches = None, 0
+    keys = API_ID_KEYS + [key for key in items[0] if key not in API_ID_KEYS] if items else []
+    for key in keys:
+        matches = sum(1 for item in items if str(item.get(key)) in page_urls)
+        if matches > best_matches:
+            best_key, best_matches = key, matches
+    return best_key, best_matches
+
+def first_value(item, keys):
+    for key in keys:
+        if item.get(key):
+            return item[key]
+    return None
+
+def api_duration(value):
+    """Seconds of duration field - APIs send numbers, "45" or "0:45" like the video cards"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value if value > 0 else None
+    if isinstance(value, str):
+        value = value.strip()
+        if re.fullmatch(r'\d+(\.\d+)?', value):
+            return float(value) or None
+        return parse_duration(value)
+    return None
+
+def find_next_value(data):
+    """Next page/cursor field of response: (found, value)"""
+    if not isinstance(data, dict):
+        return False, None
+    for key in API_NEXT_KEYS:
+        if key in data and not isinstance(data[key], (dict, list)):
+            return True, data[key]
+    for value in data.values():
+        if isinstance(value, dict):
+            found, next_value = find_next_value(value)
+            if found:
+                return True, next_value
+    return False, None
+
+def set_query_param(url, name, value):
+    parsed = urllib.parse.urlparse(url)
+    query = dict(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True))
+    if value is None:
+        query.pop(name, None)
+    else:
+        query[name] = str(value)
+    return urllib.parse.urlunparse(parsed._replace(query=urllib.parse.urlencode(query)))
+
+def find_query_param(url, names):
+    query = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(url).query))
+    return next((name for name in names if name in query), None), query
+
+def get_first_page_urls(url):
+    """Candidate URLs for first page of the listing (logged request is usually a later page)"""
+    page_param, _ = find_query_param(url, API_PAGE_PARAMS)
+    if page_param:
+        # Zero- or one-based paging - first one returning videos wins
+        return [set_query_param(url, page_param, 0), set_query_param(url, page_param, 1)]
+    offset_param, _ = find_query_param(url, API_OFFSET_PARAMS)
+    if offset_param:
+        return [set_query_param(url, offset_param, 0)]
+    cursor_param, _ = find_query_param(url, API_CURSOR_PARAMS)
+    if cursor_param:
+        return [set_query_param(url, cursor_param, None)]
+    return [url]
+
+def get_next_page_url(url, data, items):
+    """URL of next page, None when listing is finished"""
+    found, next_value = find_next_value(data)
+    if found:
+        if next_value in (None, False, ""):
+            return None
+        if isinstance(next_value, str) and next_value.startswith(("http://", "https://", "/")):
+            return urllib.parse.urljoin(url, next_value)
+        page_param, _ = find_query_param(url, API_PAGE_PARAMS)
+        cursor_param, _ = find_query_param(url, API_CURSOR_PARAMS)
+        if isinstance(next_value, int) and not isinstance(next_value, bool):
+            return set_query_param(url, page_param or "page", next_value)
+        return set_query_param(url, cursor_param or "cursor", next_value)
+    
+    # No next field - count pages or offsets ourselves
+    page_param, query = find_query_param(url, API_PAGE_PARAMS)
+    if page_param and query[page_param].isdigit():
+        return set_query_param(url, page_param, int(query[page_param]) + 1)
+    offset_param, query = find_query_param(url, API_OFFSET_PARAMS)
+    if offset_param and query[offset_param].isdigit():
+        return set_query_param(url, offset_param, int(query[offset_param]) + len(items))
+    return None  # single response with the whole library
+
+def discover_library_endpoint(crawler):
+    """Find JSON endpoint the web app loads library from, None if not found"""
+    driver, config = crawler.driver, crawler.config
+    if not any(pattern in driver.current_url for pattern in ['/video/mine', '/my-movies']):
+        driver.get(f"{config.base_url}/video/mine")
+        wait_for_page_ready(driver, config.timings["page_load"])
+        wait_until(lambda: driver.execute_script(PAGE_LOAD_STATE_JS)[0] > 0, config.timings["video_page"])
+    
+    # Scroll once so the app requests next part of library
+    state = driver.execute_script(PAGE_LOAD_STATE_JS)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    crawler.wait_for_new_cards(state)
+    
+    cards = driver.execute_script(HARVEST_VIDEO_LINKS_JS, VIDEO_LINK_SELECTORS) or []
+    page_urls = {get_video_id_from_url(card["url"]): card["url"] for card in cards if is_video_link(card["url"])}
+    
+    session = get_http_session(driver, config.parallel_workers * 2)
+    best = None
+    for request in read_json_requests(driver):
+        items = find_item_list(get_response_json(driver, session, request, config.http_timeout))
+        id_key, matches = find_id_key(items, page_urls)
+        if matches and (not best or matches > best["matches"]):
+            best = dict(request, id_key=id_key, matches=matches, items=items)
+    
+    if not best:
+        logging.warning(f"   ⚠️ No library API found among requests of {driver.current_url}")
+        return None
+    
+    # Video URLs look like the links on the page
+    video_id = next(str(item[best["id_key"]]) for item in best["items"]
+                    if str(item.get(best["id_key"])) in page_urls)
+    page_url = page_urls[video_id]
+    best["url_prefix"] = page_url[:-len(video_id)] if page_url.endswith(video_id) else f"{config.base_url}/video/"
+    logging.info(f"   → Library API: {best['url']} (video ID field '{best['id_key']}')")
+    return best
+
+def iter_api_listing(session, endpoint, timeout=30, max_pages=1000):
+    """Yield new video items of the library page by page"""
+    seen_ids = set()
+    pages_without_new = 0
+    url = None
+    
+    for candidate in get_first_page_urls(endpoint["url"]):
+        response = session.get(candidate, headers=endpoint["headers"], timeout=timeout)
+        metrics.inc("api_requests")
+        if response.ok:
+            data = response.json()
+            if find_item_list(data):
+                url = candidate
+                break
+    
+    for _ in range(max_pages):
+        if url is None:
+            return
+        items = find_item_list(data)
+        new_items = []
+        for item in items:
+            video_id = item.get(endpoint["id_key"])
+            if video_id and str(video_id) not in seen_ids:
+                seen_ids.add(str(video_id))
+                new_items.append(item)
+        
+        # API ignoring paging would return same page forever
+        pages_without_new = 0 if new_items else pages_without_new + 1
+        if pages_without_new >= 2 or not items:
+            return
+        if new_items:
+            yield new_items
+        
+        url = get_next_page_url(url, data, items)
+        if url:
+            response = session.get(url, headers=endpoint["headers"], timeout=timeout)
+            metrics.inc("api_requests")
+            response.raise_for_status()
+            data = response.json()
+
+def iter_videos_via_api(crawler):
+    """Yield video URLs of library API page by page (metadata goes to crawler) - no rendering or scrolling
+    
+    Yields nothing when no usable API was found (caller falls back to scrolling).
+    """
+    logging.info("🛰️ Listing library through web app API...")
+    config = crawler.config
+    endpoint = discover_library_endpoint(crawler)
+    if not endpoint:
+        return
+    
+    known_urls = set()
+    if config.crawl_mode == "incremental":
+        known_urls = crawler.state_store.known_urls()
+    
+    video_urls = []
+    known_streak = longest_known_streak = 0
+    session = get_http_session(crawler.driver, config.parallel_workers * 2)
+    pages = iter_api_listing(session, endpoint, config.http_timeout, config.api_max_pages)
+    for page_number, items in enumerate(pages, 1):
+        page_urls = []
+        for item in items:
+            url = f"{endpoint['url_prefix']}{item[endpoint['id_key']]}"
+            if not is_valid_video_url(url):
+                continue
+            page_urls.append(url)
+            crawler.video_metadata[url] = {
+                "title": first_value(item, API_TITLE_KEYS),
+                "thumbnail": first_value(item, API_THUMBNAIL_KEYS),
+                "duration": api_duration(item.get("duration")),
+                "created": first_value(item, ["created", "created_at", "date"]),
+            }
+            thumbnail = crawler.video_metadata[url]["thumbnail"]
+            if isinstance(thumbnail, str) and thumbnail.startswith("/"):
+                crawler.video_metadata[url]["thumbnail"] = urllib.parse.urljoin(endpoint["url"], thumbnail)
+        video_urls.extend(page_urls)
+        logging.info(f"   📄 API page {page_number}: {len(page_urls)} videos ({len(video_urls)} total)")
+        if page_urls:
+            yield page_urls
+        
+        if known_urls:
+            # Pages continue the library order - streak goes on across pages
+            for url in page_urls:
+                known_streak = known_streak + 1 if url in known_urls else 0
+                longest_known_streak = max(longest_known_streak, known_streak)
+            if longest_known_streak >= config.incremental_known_streak:
+                logging.info(f"   ⚡ Found {longest_known_streak} known videos in a row - rest of library is already known")
+                break
+    
+    logging.info(f"🎬 Found {len(video_urls)} unique videos via API")
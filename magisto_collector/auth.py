@@ -0,0 +1,187 @@
+"""Login - saved session, manual login in the browser or automatic login with credentials"""
+import logging
+import os
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .browser import load_cookie_jar, save_cookie_jar
+from .locator import find_first, wait_until
+from .metrics import metrics
+
+# Positive indicators (only shown when logged in)
+LOGIN_INDICATORS = [
+    "//a[contains(@href, '/video/mine')]",
+    "//a[contains(@href, '/my-movies')]",
+    "//button[contains(text(), 'Profile')]",
+    "//div[contains(@class, 'user-menu')]",
+    "[data-test-id*='user']",
+    ".user-avatar",
+    "//a[contains(text(), 'My Videos')]",
+    "//a[contains(text(), 'Dashboard')]"
+]
+
+def check_if_logged_in(driver, timeout=0, trust_url=True):
+    """Check if user is logged in
+    
+    Waits up to timeout for a login indicator on the page. trust_url=False ignores the
+    URL check - needed after opening a logged-in URL ourselves (it matches even when logged out).
+    """
+    try:
+        element, indicator, _ = find_first(driver, LOGIN_INDICATORS, timeout=timeout)
+        if element:
+            logging.info(f"   → Found login indicator: {indicator}")
+            return True
+        if not trust_url:
+            return False
+        
+        # Check URL - if redirected to dashboard or similar
+        current_url = driver.current_url
+        logged_in_patterns = ['/dashboard', '/video/', '/my-movies', '/profile']
+        
+        for pattern in logged_in_patterns:
+            if pattern in current_url:
+                logging.info(f"   → URL indicates login: {current_url}")
+                return True
+        
+        return False
+        
+    except Exception as e:
+        logging.warning(f"Error checking login status: {e}")
+        return False
+
+def login_to_magisto(driver, config):
+    """Login to Magisto with manual login support"""
+    logging.info("[1/5] Opening Magisto login page...")
+    
+    if config.lean_browser:
+        logging.warning("⚠️ Lean mode runs headless - manual login is not possible")
+        logging.info("💡 Log in once with lean_browser = False and chrome_profile_dir or cookie_jar_file set")
+        driver.get(f"{config.base_url}/connect")
+        return attempt_automatic_login(driver, config)
+    
+    try:
+        # Use direct login URL for manual login
+        driver.get(f"{config.base_url}/connect?q_offer_info=eyJpZCI6IjE0MDA1NDcwMjY5NzE3ODc1MzkiLCJleHBpcmF0aW9uIjoxNzUzNjgyMTc3ODQ4fQ%3D%3D")
+        
+        logging.info("🔐 MANUAL LOGIN:")
+        logging.info("   → Opened login page")
+        logging.info("   → Please log in manually in the browser")
+        logging.info("   → Press ENTER in terminal after login to continue...")
+        
+        # Wait for manual confirmation
+        input("Press ENTER after completing login...")
+        
+        # Check if user is logged in
+        logged_in = check_if_logged_in(driver)
+        
+        if logged_in:
+            logging.info("✅ Login successful!")
+            return True
+        else:
+            logging.error("❌ Login seems to have failed")
+            
+            # Try automatic login as fallback
+            logging.info("🔄 Trying automatic login...")
+            return attempt_automatic_login(driver, config)
+            
+    except Exception as e:
+        logging.error(f"Error during login: {e}")
+        return False
+
+def attempt_automatic_login(driver, config):
+    """Attempt automatic login as fallback"""
+    
+    # Check if credentials are provided
+    if not config.email or not config.password:
+        logging.warning("❌ Credentials not set - automatic login not possible")
+        logging.info("💡 Set email and password in configuration (or MAGISTO_EMAIL and MAGISTO_PASSWORD) for automatic login")
+        return False
+    
+    try:
+        logging.info("Looking for login form...")
+        
+        # Search for login button or form
+        login_selectors = [
+            "//a[contains(text(),'Log in')]",
+            "//a[contains(text(),'Sign in')]",
+            "//button[contains(text(),'Log in')]",
+            "//button[contains(text(),'Sign in')]",
+            ".login-btn",
+            "[data-test-id='login-button']",
+            "input[name='email']"  # Direct search for email field
+        ]
+        
+        login_element, _, _ = find_first(driver, login_selectors, timeout=config.timings["login_form"])
+        
+        if not login_element:
+            logging.warning("Login form not found")
+            return False
+        
+        # If we find email field directly, we're already on login page
+        if login_element.get_attribute("name") == "email":
+            email_input = login_element
+        else:
+            # Click login button
+            login_element.click()
+            # Find email field
+            email_input = WebDriverWait(driver, config.timings["login_form"]).until(
+                EC.presence_of_element_located((By.NAME, "email"))
+            )
+        
+        password_input = driver.find_element(By.NAME, "password")
+        
+        email_input.clear()
+        email_input.send_keys(config.email)
+        password_input.clear()
+        password_input.send_keys(config.password)
+        password_input.send_keys(Keys.RETURN)
+        
+        # Wait for login - page leaves the login form when it succeeds
+        wait_until(lambda: not driver.find_elements(By.NAME, "password"), config.timings["login_result"])
+        return check_if_logged_in(driver)
+        
+    except Exception as e:
+        logging.error(f"Automatic login failed: {e}")
+        return False
+
+def restore_session(driver, config):
+    """Reuse login from persistent profile or saved cookies - no login page, no ENTER prompt
+    
+    Returns None when there is no saved session to try.
+    """
+    has_cookie_jar = bool(config.cookie_jar_file) and os.path.exists(config.cookie_jar_file)
+    if not config.chrome_profile_dir and not has_cookie_jar:
+        return None
+    
+    if has_cookie_jar:
+        loaded = load_cookie_jar(driver, config.cookie_jar_file, config.base_url)
+        logging.info(f"🍪 Loaded {loaded} saved session cookies")
+    
+    # Open videos page directly - it is needed next anyway. Its URL says nothing about
+    # the session (it stays the same without redirect), so only the page content counts.
+    driver.get(f"{config.base_url}/video/mine")
+    return check_if_logged_in(driver, timeout=config.timings["login_result"], trust_url=False)
+
+def ensure_logged_in(driver, config):
+    """Reuse saved session or log in (manually or with credentials) - returns True when logged in"""
+    logging.info("🚀 Starting login process...")
+    
+    with metrics.timer("login_seconds"):
+        # First check if already logged in
+        restored = restore_session(driver, config)
+        if restored:
+            logging.info("✅ Saved session is valid! Skipping login process.")
+        elif restored is None and check_if_logged_in(driver):
+            logging.info("✅ Already logged in! Skipping login process.")
+        else:
+            if restored is False:
+                logging.info("⚠️ Saved session has expired - logging in again")
+            if not login_to_magisto(driver, config):
+                logging.error("❌ Login failed")
+                return False
+            if config.cookie_jar_file:
+                save_cookie_jar(driver, config.cookie_jar_file)
+    return True
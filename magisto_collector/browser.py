@@ -0,0 +1,248 @@
+"""Browser setup, session cookies and HTTP session shared with the browser
+
+Importing this module loads Selenium - browser-free commands don't import it.
+"""
+import json
+import logging
+import os
+import platform
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from .metrics import metrics
+
+def get_brave_binary_path():
+    """Find path to Brave browser on different OS"""
+    system = platform.system()
+    
+    if system == "Linux":
+        brave_paths = [
+            "/usr/bin/brave-browser",
+            "/usr/bin/brave",
+            "/snap/brave/current/usr/bin/brave",
+            "/var/lib/flatpak/app/com.brave.Browser/current/active/files/brave",
+            "/usr/local/bin/brave-browser",
+            "/opt/brave.com/brave/brave-browser"
+        ]
+    elif system == "Darwin":  # macOS
+        brave_paths = [
+            "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
+        ]
+    elif system == "Windows":
+        brave_paths = [
+            "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
+            "C:\\Program Files (x86)\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
+            os.path.expanduser("~\\AppData\\Local\\BraveSoftware\\Brave-Browser\\Application\\brave.exe")
+        ]
+    else:
+        return None
+    
+    for path in brave_paths:
+        if os.path.exists(path):
+            return path
+    
+    return None
+
+def cached_chromedriver_path(cache_file):
+    """ChromeDriver path cached by an earlier run, None if there is no usable one"""
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached_path = f.read().strip()
+        if cached_path and os.access(cached_path, os.X_OK):
+            return cached_path
+    return None
+
+def resolve_chromedriver_path(cache_file, refresh=False):
+    """ChromeDriver path - cached locally so webdriver-manager doesn't check versions online every run
+    
+    refresh=True ignores the cache and installs the driver matching the current browser.
+    """
+    cached_path = None if refresh else cached_chromedriver_path(cache_file)
+    if cached_path:
+        return cached_path
+    
+    from webdriver_manager.chrome import ChromeDriverManager  # only needed when not cached
+    driver_path = ChromeDriverManager().install()
+    if cache_file:
+        try:
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                f.write(driver_path)
+        except OSError as e:
+            logging.debug(f"   ⚠️ Could not cache ChromeDriver path: {e}")
+    return driver_path
+
+def setup_browser_driver(config, profile_dir=None, lean=None, network_log=False):
+    """Setup browser (Chrome or Brave) with optimized options"""
+    if lean is None:
+        lean = config.lean_browser
+    options = Options()
+    prefs = {
+        "download.default_directory": config.download_dir,
+        "download.prompt_for_download": False,
+        "safebrowsing.enabled": True,
+        "profile.default_content_setting_values.notifications": 2  # block notifications
+    }
+    
+    if lean:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_argument("--mute-audio")
+        # Don't wait for images, iframes etc. - only for the DOM
+        options.page_load_strategy = "eager"
+        prefs["profile.managed_default_content_settings.images"] = 2
+    else:
+        options.add_argument("--start-maximized")
+    
+    options.add_experimental_option("prefs", prefs)
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    
+    if network_log:
+        # DevTools network events in performance log (used to find library API)
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    
+    if profile_dir:
+        # Persistent profile keeps cookies (login) between runs
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    
+    # Create download folder
+    os.makedirs(config.download_dir, exist_ok=True)
+    
+    if config.browser_type.lower() == "brave":
+        # Setup for Brave browser
+        brave_path = get_brave_binary_path()
+        if brave_path:
+            options.binary_location = brave_path
+            logging.info(f"Trying to use Brave browser: {brave_path}")
+            logging.warning("WARNING: Brave may have issues with ChromeDriver version!")
+            logging.info("If errors occur, change browser_type to 'chrome'")
+        else:
+            logging.error("Brave browser not found! Switching to Chrome...")
+            logging.info("Install Brave or change browser_type to 'chrome'")
+    else:
+        logging.info("Using Chrome browser")
+    
+    try:
+        cached_path = cached_chromedriver_path(config.chromedriver_cache_file)
+        try:
+            driver_path = cached_path or resolve_chromedriver_path(config.chromedriver_cache_file, refresh=True)
+            driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        except Exception as e:
+            if not cached_path:
+                raise
+            # Browser updated itself since the driver was cached - fetch the matching one once
+            logging.debug(f"   Cached ChromeDriver {cached_path}: {e}")
+            logging.warning(f"⚠️ Cached ChromeDriver failed to start ({type(e).__name__}) - "
+                            f"installing the one matching the browser")
+            driver_path = resolve_chromedriver_path(config.chromedriver_cache_file, refresh=True)
+            driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        count_webdriver_commands(driver)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if lean:
+            enable_lean_mode(driver, config)
+        logging.info("Browser successfully started!")
+        return driver
+    except Exception as e:
+        logging.error(f"Error starting browser: {e}")
+        if config.browser_type.lower() == "brave":
+            logging.error("Problem with Brave browser - probably incompatible ChromeDriver version")
+            logging.info("SOLUTION: Change browser_type to 'chrome' in configuration")
+            logging.info("Or install older Brave version or newer ChromeDriver version")
+        raise
+
+def enable_lean_mode(driver, config):
+    """Block heavy and third-party requests through DevTools and allow headless downloads"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": config.lean_blocked_urls})
+    # Headless Chrome ignores download prefs - downloads must be allowed explicitly
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+        "behavior": "allow",
+        "downloadPath": config.download_dir
+    })
+    logging.info(f"🪶 Lean mode: headless, eager page loads, {len(config.lean_blocked_urls)} URL patterns blocked")
+
+def count_webdriver_commands(driver):
+    """Count every WebDriver command (round trip to the browser) in metrics"""
+    execute = driver.execute
+    
+    def counted_execute(driver_command, params=None):
+        metrics.inc("webdriver_commands")
+        return execute(driver_command, params)
+    
+    driver.execute = counted_execute
+
+def add_session_cookies(target_driver, cookies, base_url):
+    """Add cookies to browser, returns number of accepted cookies"""
+    # Cookies can only be set for the domain that is currently open
+    target_driver.get(f"{base_url}/")
+    
+    copied = 0
+    for cookie in cookies:
+        # Chrome rejects some keys coming back from get_cookies()
+        cookie = {key: value for key, value in cookie.items() if key != 'sameSite'}
+        try:
+            target_driver.add_cookie(cookie)
+            copied += 1
+        except Exception as e:
+            logging.debug(f"   ⚠️ Cookie '{cookie.get('name')}' not copied: {e}")
+    return copied
+
+def copy_session_cookies(source_driver, target_driver, base_url):
+    """Copy logged-in session cookies from one browser to another (shared login)"""
+    copied = add_session_cookies(target_driver, source_driver.get_cookies(), base_url)
+    target_driver.refresh()
+    return copied
+
+def save_cookie_jar(driver, cookie_file):
+    """Save login cookies so the next run can skip login"""
+    try:
+        with open(cookie_file, 'w', encoding='utf-8') as f:
+            json.dump(driver.get_cookies(), f)
+        os.chmod(cookie_file, 0o600)  # cookies give access to the account
+        logging.info(f"🍪 Session cookies saved to {cookie_file}")
+    except Exception as e:
+        logging.warning(f"Could not save cookies: {e}")
+
+def load_cookie_jar(driver, cookie_file, base_url):
+    """Load saved login cookies into browser"""
+    try:
+        with open(cookie_file, 'r', encoding='utf-8') as f:
+            cookies = json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not load cookies: {e}")
+        return 0
+    
+    # Expired cookies would only be rejected by the site
+    now = time.time()
+    cookies = [cookie for cookie in cookies if cookie.get('expiry', now + 1) > now]
+    return add_session_cookies(driver, cookies, base_url)
+
+# Pooled requests session for direct HTTP calls (library API, http download mode)
+http_session = None
+http_session_lock = threading.Lock()
+
+def get_http_session(driver, pool_size=4):
+    """Pooled HTTP session sharing cookies and user agent with the browser"""
+    global http_session
+    with http_session_lock:
+        if http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, pool_size))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+            http_session = session
+        
+        for cookie in driver.get_cookies():
+            http_session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        return http_session
@@ -0,0 +1,114 @@
+"""Local catalog of the library - title, duration, creation date and thumbnail of every video
+
+Metadata comes from the library listing (scrolled page or API), so it is collected
+for the whole library in one sweep without opening a single video page. Every crawl
+updates the catalog; the catalog command additionally saves thumbnails, fetched in
+parallel through the pooled HTTP session with the browser's login cookies.
+"""
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import metrics
+from .urls import get_video_id_from_url
+
+THUMBNAIL_FOLDER = ".thumbnails"  # in download_dir - hidden, so skip detection ignores it
+THUMBNAIL_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+def thumbnail_path(config, video_id, thumbnail_url):
+    ext = os.path.splitext(urllib.parse.urlparse(thumbnail_url).path)[1].lower()
+    if ext not in THUMBNAIL_EXTENSIONS:
+        ext = '.jpg'
+    return os.path.join(config.download_dir, THUMBNAIL_FOLDER, f"{video_id}{ext}")
+
+def fetch_thumbnail(session, thumbnail_url, path, timeout=30):
+    """Save thumbnail (atomically) - returns number of bytes"""
+    response = session.get(thumbnail_url, timeout=timeout)
+    response.raise_for_status()
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(response.content)
+    os.replace(temp_path, path)
+    return len(response.content)
+
+class ThumbnailFetcher:
+    """Downloads thumbnails in worker threads while the crawl goes on"""
+
+    def __init__(self, session, config, state_store, workers=8):
+        self.session = session
+        self.config = config
+        self.state_store = state_store
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self.lock = threading.Lock()
+        self.fetched = 0
+        self.failed = 0
+        self.bytes = 0
+        os.makedirs(os.path.join(config.download_dir, THUMBNAIL_FOLDER), exist_ok=True)
+
+    def submit(self, video_url, thumbnail_url):
+        self.pool.submit(self.fetch, video_url, thumbnail_url)
+
+    def fetch(self, video_url, thumbnail_url):
+        path = thumbnail_path(self.config, get_video_id_from_url(video_url), thumbnail_url)
+        try:
+            size = fetch_thumbnail(self.session, thumbnail_url, path, self.config.http_timeout)
+        except Exception as e:
+            logging.debug(f"   ⚠️ Thumbnail of {video_url} failed: {e}")
+            with self.lock:
+                self.failed += 1
+            return
+        self.state_store.set_thumbnail_file(video_url, path)
+        with self.lock:
+            self.fetched += 1
+            self.bytes += size
+
+    def finish(self):
+        self.pool.shutdown(wait=True)
+        metrics.inc("thumbnails_fetched", self.fetched)
+        metrics.inc("thumbnail_bytes", self.bytes)
+
+def has_thumbnail(config, entry):
+    return bool(entry and entry["thumbnail_file"] and
+                os.path.exists(os.path.join(config.download_dir, entry["thumbnail_file"])))
+
+def build_catalog(driver, config, state_store, thumbnails=True):
+    """Crawl the library into the catalog, fetching thumbnails meanwhile - returns number of videos"""
+    from .browser import get_http_session
+    from .crawl import LibraryCrawler
+
+    start = time.time()
+    existing = state_store.catalog_entries()
+    crawler = LibraryCrawler(driver, config, state_store)
+    fetcher = None
+    if thumbnails:
+        session = get_http_session(driver, config.catalog_thumbnail_workers * 2)
+        fetcher = ThumbnailFetcher(session, config, state_store, config.catalog_thumbnail_workers)
+
+    found = 0
+    try:
+        with metrics.timer("crawl_seconds"):
+            for url in crawler.iter_videos():
+                found += 1
+                thumbnail_url = crawler.video_metadata.get(url, {}).get("thumbnail")
+                if (fetcher and isinstance(thumbnail_url, str) and thumbnail_url.startswith("http") and
+                        not has_thumbnail(config, existing.get(url))):
+                    fetcher.submit(url, thumbnail_url)
+    finally:
+        if fetcher:
+            fetcher.finish()
+    metrics.inc("videos_found", found)
+
+    if not found:
+        crawler.log_debug_info()
+        return 0
+
+    catalog_size, with_thumbnail = state_store.catalog_counts()
+    logging.info(f"📚 Catalog updated with {found} videos in {time.time() - start:.1f}s "
+                 f"({catalog_size} videos in catalog, {with_thumbnail} with thumbnail)")
+    if fetcher:
+        logging.info(f"   🖼️  Thumbnails: {fetcher.fetched} fetched ({fetcher.bytes / (1024**2):.1f} MB), "
+                     f"{fetcher.failed} failed")
+    return found
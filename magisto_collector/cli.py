@@ -0,0 +1,508 @@
+"""Command line interface - python -m magisto_collector <command>
+
+Browser commands (login, collect, download, run) import Selenium only when they start,
+status, verify and organize work with the state database alone and start instantly.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from .config import FILE_LAYOUTS, TIMING_PROFILES, Config
+from .manifest import read_manifest, select_shard, write_manifest
+from .metrics import metrics
+from .state import StateStore
+
+COMMANDS = ("login", "collect", "catalog", "download", "run", "status", "verify", "organize")
+
+def setup_logging(log_file):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
+def parse_shard(value):
+    """Parse "i/n" (1-based shard number / number of shards)"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like 2/5, got '{value}'")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {value} out of range (1/n ... n/n)")
+    return index, count
+
+def build_parser():
+    # Global options are accepted before and after the command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--download-dir", default=argparse.SUPPRESS, help="folder for downloaded videos")
+    common.add_argument("--timing-profile", choices=list(TIMING_PROFILES), default=argparse.SUPPRESS,
+                        help="wait ceilings for page elements")
+    common.add_argument("--workers", type=int, default=argparse.SUPPRESS,
+                        help="number of parallel browser windows for downloading")
+    common.add_argument("--lean", action="store_true", default=argparse.SUPPRESS,
+                        help="headless browser without images, fonts and trackers (needs saved session)")
+    common.add_argument("--layout", choices=list(FILE_LAYOUTS), default=argparse.SUPPRESS,
+                        help="folder layout and names of downloaded videos")
+    common.add_argument("--pipeline", action="store_true", default=argparse.SUPPRESS,
+                        help="start downloading while the library is still being crawled")
+
+    parser = argparse.ArgumentParser(prog="magisto_collector", parents=[common],
+                                     description="Download all videos from your Magisto library")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    commands.add_parser("login", parents=[common], help="log in and save the session for later runs")
+
+    collect = commands.add_parser("collect", parents=[common], help="find videos and write them to manifest")
+    collect.add_argument("--output", metavar="MANIFEST", help="manifest file (default from config)")
+
+    catalog = commands.add_parser("catalog", parents=[common],
+                                  help="store title, duration, date and thumbnail of every video locally")
+    catalog.add_argument("--no-thumbnails", action="store_true", help="only metadata, don't fetch thumbnails")
+
+    download = commands.add_parser("download", parents=[common],
+                                   help="download videos from manifest or not yet downloaded known videos")
+    download.add_argument("--from-manifest", metavar="MANIFEST", help="download videos listed in manifest")
+    download.add_argument("--dead-letter", action="store_true",
+                          help="re-run only videos in the dead-letter list (failed permanently or out of retries)")
+    download.add_argument("--shard", type=parse_shard, metavar="I/N",
+                          help="download only slice I of N (e.g. 1/3, 2/3, 3/3 on three computers)")
+
+    run = commands.add_parser("run", parents=[common], help="log in, find videos and download them (default)")
+    run.add_argument("--collect-only", nargs="?", const="", metavar="MANIFEST",
+                     help="only find videos and write them to manifest (default from config)")
+    run.add_argument("--from-manifest", metavar="MANIFEST",
+                     help="skip library crawl, download videos listed in manifest")
+    run.add_argument("--shard", type=parse_shard, metavar="I/N",
+                     help="download only slice I of N (e.g. 1/3, 2/3, 3/3 on three computers)")
+
+    commands.add_parser("status", parents=[common], help="show download state (no browser)")
+    verify = commands.add_parser("verify", parents=[common],
+                                 help="hash downloaded videos, re-queue broken ones, report duplicates (no browser)")
+    verify.add_argument("--rehash", action="store_true", help="hash also files verified in previous runs")
+    organize = commands.add_parser("organize", parents=[common],
+                                   help="move earlier downloads to canonical names in subfolders (no browser)")
+    organize.add_argument("--dry-run", action="store_true", help="only show what would be moved")
+    return parser
+
+def config_from_args(args):
+    overrides = {}
+    if "download_dir" in args:
+        overrides["download_dir"] = args.download_dir
+    if "timing_profile" in args:
+        overrides["timing_profile"] = args.timing_profile
+    if "workers" in args:
+        overrides["parallel_workers"] = args.workers
+    if "lean" in args:
+        overrides["lean_browser"] = True
+    if "layout" in args:
+        overrides["file_layout"] = args.layout
+    if "pipeline" in args:
+        overrides["pipeline_mode"] = True
+    return Config.from_env(**overrides)
+
+def open_state_store(config):
+    """Open state database (imports old download_mapping.txt on first run)"""
+    state_store = StateStore(config.state_db_path, config.state_commit_every, files_dir=config.download_dir)
+    state_store.open()
+    state_store.migrate_mapping_file(os.path.join(config.download_dir, "download_mapping.txt"))
+    return state_store
+
+def with_browser(config, command, network_log=False, needs_state=True):
+    """Start browser, log in and run command(driver, state_store) - returns exit code"""
+    from .auth import ensure_logged_in
+    from .browser import setup_browser_driver
+
+    metrics.configure(config.metrics_json_file, config.metrics_prom_file, config.metrics_export_interval)
+    metrics.start_periodic_export()
+
+    try:
+        driver = setup_browser_driver(config, profile_dir=config.chrome_profile_dir, network_log=network_log)
+    except Exception as e:
+        logging.error(f"Cannot start browser ({e}). Exiting script.")
+        metrics.stop()
+        return 1
+
+    state_store = None
+    try:
+        if not ensure_logged_in(driver, config):
+            return 1
+        if needs_state:
+            state_store = open_state_store(config)
+        return command(driver, state_store)
+    finally:
+        if state_store:
+            state_store.close()
+        metrics.stop()
+        if config.metrics_json_file:
+            logging.info(f"📈 Timing metrics saved to {config.metrics_json_file}")
+        try:
+            driver.quit()
+        except:
+            pass  # browser crashed and was replaced during downloads
+
+def collect_videos(driver, config, state_store):
+    """Crawl the library - returns (video_urls, video_metadata), no URLs if nothing was found"""
+    from .crawl import LibraryCrawler
+
+    crawler = LibraryCrawler(driver, config, state_store)
+    with metrics.timer("crawl_seconds"):
+        video_urls = crawler.load_all_videos()
+    metrics.inc("videos_found", len(video_urls))
+
+    if not video_urls:
+        crawler.log_debug_info()
+        return [], {}
+
+    # Found videos are already in state database - the crawler stores them after every scroll step
+    logging.info(f"✅ Final count of valid video URLs: {len(video_urls)}")
+    return video_urls, crawler.video_metadata
+
+def load_manifest(manifest_path):
+    """Video URLs and their metadata from manifest: (video_urls, video_metadata)
+
+    Called before the browser starts - a missing or unreadable manifest gives no videos.
+    """
+    try:
+        video_urls, video_metadata = read_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        logging.error(f"❌ Cannot read manifest {manifest_path}: {e}")
+        return [], {}
+    if not video_urls:
+        logging.error("❌ No videos in manifest.")
+    metrics.inc("videos_found", len(video_urls))
+    return video_urls, video_metadata
+
+def log_folder_summary(download_dir):
+    """Show information about downloaded files"""
+    if not os.path.exists(download_dir):
+        return
+
+    # Organized layouts keep videos in subfolders
+    all_videos = []
+    for folder, _, file_names in os.walk(download_dir):
+        all_videos.extend(os.path.join(folder, name) for name in file_names
+                          if name.lower().endswith(('.mp4', '.mov', '.avi', '.mkv', '.webm')))
+
+    logging.info(f"📁 Total videos in downloads folder: {len(all_videos)}")
+
+    # Show folder size
+    try:
+        total_size = sum(os.path.getsize(f) for f in all_videos if os.path.isfile(f))
+        size_gb = total_size / (1024**3)
+        logging.info(f"💾 Total size: {size_gb:.2f} GB")
+    except:
+        pass
+
+def dead_letter_urls(state_store):
+    return {entry["url"] for entry in state_store.entries("dead")}
+
+def download_videos(driver, config, state_store, video_urls, shard=None, dead_letter=False, video_metadata=None):
+    """Download videos of given shard (interrupted ones first) and log statistics
+
+    Videos in the dead-letter list are left out unless dead_letter is set.
+    """
+    from .download import Downloader
+
+    if not dead_letter:
+        dead = dead_letter_urls(state_store)
+        skipped_dead = [url for url in video_urls if url in dead]
+        if skipped_dead:
+            logging.info(f"💀 Leaving out {len(skipped_dead)} videos in dead-letter list "
+                         f"(re-run them with: python -m magisto_collector download --dead-letter)")
+            video_urls = [url for url in video_urls if url not in dead]
+
+    if shard:
+        shard_index, shard_count = shard
+        video_urls = select_shard(video_urls, shard_index, shard_count)
+        logging.info(f"🧩 Shard {shard_index}/{shard_count}: {len(video_urls)} videos")
+    video_urls = state_store.resume_order(video_urls)
+
+    downloader = Downloader(config, state_store)
+    downloader.video_metadata = video_metadata if video_metadata is not None else {}
+    downloader.start()
+    try:
+        stats = downloader.run(driver, video_urls)
+    finally:
+        unfinished_downloads = downloader.stop()
+
+    return finish_downloads(config, state_store, downloader, stats, unfinished_downloads)
+
+def pipeline_downloads(driver, config, state_store, video_source, shard=None, dead_letter=False, crawling=False,
+                       video_metadata=None):
+    """Download videos while they are still being discovered (see pipeline.py) and log statistics
+
+    With crawling=True video_source uses the main browser until discovery ends,
+    downloads use additional browsers from the start.
+    """
+    import asyncio
+
+    from .download import Downloader
+    from .pipeline import DownloadPipeline
+
+    downloader = Downloader(config, state_store)
+    downloader.video_metadata = video_metadata if video_metadata is not None else {}
+    downloader.start()
+    downloader.session_cookies = driver.get_cookies()
+    extra_browsers = config.parallel_workers if crawling else config.parallel_workers - 1
+    drivers = downloader.start_worker_browsers(driver, extra_browsers)
+    if not crawling:
+        drivers.insert(0, driver)
+
+    skip_urls = () if dead_letter else dead_letter_urls(state_store)
+    pipeline = DownloadPipeline(config, state_store, downloader, shard=shard, skip_urls=skip_urls)
+    try:
+        stats = asyncio.run(pipeline.run(video_source, drivers, crawl_driver=driver if crawling else None))
+    finally:
+        unfinished_downloads = downloader.stop()
+        # Main driver is closed by the caller
+        for worker_driver in drivers:
+            if worker_driver is not driver:
+                try:
+                    worker_driver.quit()
+                except:
+                    pass
+
+    return finish_downloads(config, state_store, downloader, stats, unfinished_downloads)
+
+def finish_downloads(config, state_store, downloader, stats, unfinished_downloads):
+    """Verify downloads and log statistics of the run"""
+    if config.verify_downloads:
+        from .integrity import verify_downloads
+        state_store.flush()
+        verify_downloads(config, state_store)
+    state_counts = state_store.status_counts()
+
+    logging.info("=" * 60)
+    logging.info(f"[5/5] ✅ COMPLETED! Overall statistics:")
+    logging.info(f"   📥 Newly downloaded: {stats['downloaded']}")
+    logging.info(f"   ⏭️  Skipped (already downloaded): {stats['skipped']}")
+    logging.info(f"   ❌ Errors (moved to dead-letter list): {stats['failed']}")
+    logging.info(f"   🔁 Retries: {stats['retried']}")
+    logging.info(f"   📊 Total processed: {stats['downloaded'] + stats['skipped'] + stats['failed']}")
+    logging.info(f"   ✅ Downloads confirmed complete: {downloader.tracker.completed_count}")
+    if "verified" in stats:
+        logging.info(f"   🔎 Verified while downloading: {stats['verified']} ok, {stats['broken']} broken")
+    quality = downloader.quality.summary()
+    if quality["downloaded_bytes"]:
+        logging.info(f"   📦 Downloaded {quality['downloaded_bytes'] / (1024**3):.2f} GB "
+                     f"(quality policy '{config.quality_policy}')")
+    if quality["projected_bytes"]:
+        logging.info(f"   📐 Projected {quality['projected_bytes'] / (1024**3):.2f} GB for videos with known size, "
+                     f"got {quality['actual_bytes'] / (1024**3):.2f} GB "
+                     f"({quality['actual_bytes'] / quality['projected_bytes']:.0%})")
+    if quality["budget"]:
+        logging.info(f"   💾 Budget: {quality['used_bytes'] / (1024**3):.2f} of {quality['budget'] / (1024**3):.1f} GB used")
+    if config.governor_enabled:
+        logging.info(f"   🚦 Sustained pace at the end: {downloader.governor.describe()}")
+    if unfinished_downloads:
+        logging.info(f"   ⏳ Downloads not finished in time: {unfinished_downloads}")
+    logging.info("   🗃️  State database: " + ", ".join(f"{status}={count}" for status, count in sorted(state_counts.items())))
+
+    log_folder_summary(config.download_dir)
+    logging.info("=" * 60)
+    return 0
+
+def cmd_login(args, config):
+    def command(driver, state_store):
+        if not config.chrome_profile_dir and not config.cookie_jar_file:
+            logging.warning("⚠️ Neither chrome_profile_dir nor cookie_jar_file is set - session won't be kept")
+        logging.info("✅ Logged in")
+        return 0
+
+    return with_browser(config, command, needs_state=False)
+
+def cmd_collect(args, config):
+    def command(driver, state_store):
+        video_urls, video_metadata = collect_videos(driver, config, state_store)
+        if not video_urls:
+            return 1
+        write_manifest(args.output or config.manifest_file, video_urls, video_metadata)
+        return 0
+
+    return with_browser(config, command, network_log=config.listing_mode == "api")
+
+def cmd_catalog(args, config):
+    from .catalog import build_catalog
+
+    def command(driver, state_store):
+        return 0 if build_catalog(driver, config, state_store, thumbnails=not args.no_thumbnails) else 1
+
+    return with_browser(config, command, network_log=config.listing_mode == "api")
+
+def cmd_download(args, config):
+    if args.from_manifest and not args.dead_letter:
+        manifest_urls, manifest_metadata = load_manifest(args.from_manifest)
+        if not manifest_urls:
+            return 1
+
+    def command(driver, state_store):
+        video_metadata = {}
+        if args.dead_letter:
+            video_urls = [entry["url"] for entry in state_store.entries("dead")]
+            logging.info(f"💀 {len(video_urls)} videos in dead-letter list")
+        elif args.from_manifest:
+            video_urls, video_metadata = manifest_urls, manifest_metadata
+        else:
+            video_urls = state_store.pending_urls()
+            logging.info(f"📋 {len(video_urls)} known videos not downloaded yet")
+        if not video_urls:
+            return 1 if args.from_manifest else 0
+        if config.pipeline_mode:
+            return pipeline_downloads(driver, config, state_store, video_urls, args.shard, dead_letter=args.dead_letter,
+                                      video_metadata=video_metadata)
+        return download_videos(driver, config, state_store, video_urls, args.shard, dead_letter=args.dead_letter,
+                               video_metadata=video_metadata)
+
+    return with_browser(config, command)
+
+def iter_run_videos(driver, config, state_store, video_metadata):
+    """Videos for the pipeline - known videos not downloaded yet right away, then the crawl as it scrolls
+
+    Metadata of crawled videos is added to video_metadata as they are found.
+    """
+    from .crawl import LibraryCrawler
+
+    pending = state_store.pending_urls()
+    if pending:
+        logging.info(f"📋 Starting with {len(pending)} known videos not downloaded yet")
+    yield from pending
+
+    crawler = LibraryCrawler(driver, config, state_store)
+    crawler.video_metadata = video_metadata
+    found = 0
+    with metrics.timer("crawl_seconds"):
+        for url in crawler.iter_videos():
+            found += 1
+            yield url
+    metrics.inc("videos_found", found)
+    if not found:
+        crawler.log_debug_info()
+
+def cmd_run(args, config):
+    if args.from_manifest:
+        # Check the manifest before the browser starts and maybe waits for a manual login
+        manifest_urls, manifest_metadata = load_manifest(args.from_manifest)
+        if not manifest_urls:
+            return 1
+
+    def command(driver, state_store):
+        if config.pipeline_mode and args.collect_only is None:
+            if args.from_manifest:
+                return pipeline_downloads(driver, config, state_store, manifest_urls, args.shard,
+                                          video_metadata=manifest_metadata)
+            video_metadata = {}
+            return pipeline_downloads(driver, config, state_store,
+                                      iter_run_videos(driver, config, state_store, video_metadata),
+                                      args.shard, crawling=True, video_metadata=video_metadata)
+
+        if args.from_manifest:
+            video_urls, video_metadata = manifest_urls, manifest_metadata
+        else:
+            video_urls, video_metadata = collect_videos(driver, config, state_store)
+            if not video_urls:
+                return 1
+            if args.collect_only is not None:
+                write_manifest(args.collect_only or config.manifest_file, video_urls, video_metadata)
+                return 0
+
+            if config.crawl_mode == "incremental":
+                # Older videos were not crawled - add the ones still waiting for download
+                crawled = set(video_urls)
+                pending = [url for url in state_store.pending_urls() if url not in crawled]
+                if pending:
+                    logging.info(f"   ➕ Adding {len(pending)} known videos not downloaded yet")
+                    video_urls = video_urls + pending
+
+        return download_videos(driver, config, state_store, video_urls, args.shard, video_metadata=video_metadata)
+
+    return with_browser(config, command, network_log=config.listing_mode == "api" and not args.from_manifest)
+
+def cmd_status(args, config):
+    # Don't create an empty database just by looking
+    if not os.path.exists(config.state_db_path):
+        print(f"No state database at {config.state_db_path} - nothing downloaded yet")
+        return 0
+
+    state_store = StateStore(config.state_db_path, files_dir=config.download_dir)
+    state_store.open()
+    try:
+        counts = state_store.status_counts()
+        catalog_size, with_thumbnail = state_store.catalog_counts()
+        failed = state_store.entries("failed")
+        dead = state_store.entries("dead")
+    finally:
+        state_store.close()
+
+    print(f"State database: {config.state_db_path}")
+    print(f"Videos known: {sum(counts.values())}")
+    for status, count in sorted(counts.items()):
+        print(f"   {status:<12} {count}")
+    if catalog_size:
+        print(f"Catalog: {catalog_size} videos ({with_thumbnail} with thumbnail)")
+    for title, entries in (("Recent failures (retried in next run):", failed),
+                           ("Dead-letter list (download --dead-letter):", dead)):
+        if not entries:
+            continue
+        print(title)
+        for entry in sorted(entries, key=lambda entry: entry["updated_at"] or 0, reverse=True)[:10]:
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["updated_at"] or 0))
+            print(f"   {updated}  {entry['url']}  [{entry['error_class'] or 'error'}] {entry['last_error']}")
+    return 0
+
+def cmd_verify(args, config):
+    from .integrity import verify_downloads
+
+    if not os.path.exists(config.state_db_path):
+        logging.error(f"❌ No state database at {config.state_db_path}")
+        return 1
+
+    state_store = open_state_store(config)
+    try:
+        summary = verify_downloads(config, state_store, rehash=args.rehash)
+    finally:
+        state_store.close()
+    return 1 if summary["requeued"] else 0
+
+def cmd_organize(args, config):
+    from .organizer import organize_existing
+
+    if config.file_layout == "flat":
+        logging.error("❌ Choose a layout: organize --layout id_prefix (or month), or set file_layout")
+        return 1
+    if not os.path.exists(config.state_db_path):
+        logging.error(f"❌ No state database at {config.state_db_path}")
+        return 1
+
+    state_store = open_state_store(config)
+    try:
+        organize_existing(config, state_store, dry_run=args.dry_run)
+    finally:
+        state_store.close()
+    return 0
+
+COMMAND_HANDLERS = {
+    "login": cmd_login,
+    "collect": cmd_collect,
+    "catalog": cmd_catalog,
+    "download": cmd_download,
+    "run": cmd_run,
+    "status": cmd_status,
+    "verify": cmd_verify,
+    "organize": cmd_organize,
+}
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Old style "magisto_downloader.py [--collect-only] [--shard 1/3]" means "run"
+    if not any(arg in COMMANDS for arg in argv) and not {"-h", "--help"} & set(argv):
+        argv.insert(0, "run")
+
+    args = build_parser().parse_args(argv)
+    config = config_from_args(args)
+    setup_logging(config.log_file)
+    return COMMAND_HANDLERS[args.command](args, config)
@@ -0,0 +1,197 @@
+"""Settings of the Magisto collector
+
+Defaults below can be changed here, passed to Config(...) in code, or overridden
+by MAGISTO_<NAME> environment variables, e.g. MAGISTO_DOWNLOAD_DIR=/data/magisto
+(used by benchmarks/run_benchmark.py).
+"""
+import dataclasses
+import os
+from dataclasses import dataclass, field
+
+from .quality import parse_policy
+
+# Timing profile - every wait ends as soon as the page is ready, these are only the ceilings.
+# "fast" for a fast connection, "slow" if elements are often not found in time.
+TIMING_PROFILES = {
+    #                    page ready, video widget, download button, popup, login form, login result,
+    #                    scroll, network idle, download start
+    "fast":   {"page_load": 5,  "video_page": 5,  "download_button": 8,  "popup": 2, "login_form": 5,
+               "login_result": 10, "scroll": 5,  "network_idle": 0.5, "download_start": 5},
+    "normal": {"page_load": 10, "video_page": 10, "download_button": 15, "popup": 5, "login_form": 10,
+               "login_result": 20, "scroll": 10, "network_idle": 1.0, "download_start": 10},
+    "slow":   {"page_load": 20, "video_page": 20, "download_button": 30, "popup": 8, "login_form": 20,
+               "login_result": 40, "scroll": 20, "network_idle": 2.0, "download_start": 20},
+}
+
+# Folder layouts of downloaded videos - see organizer.py
+FILE_LAYOUTS = ("flat", "id_prefix", "month")
+
+# Requests blocked in lean browser mode
+LEAN_BLOCKED_URLS = [
+    # Images and fonts
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Streamed video previews (video files themselves stay allowed for downloads)
+    "*.m3u8", "*.mpd",
+    # Trackers and analytics
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*segment.io*",
+    "*mixpanel.com*", "*amplitude.com*", "*intercom.io*", "*optimizely.com*",
+]
+
+def env_setting(name, default):
+    """Configuration value, can be overridden by MAGISTO_<name> environment variable"""
+    value = os.environ.get(f"MAGISTO_{name}")
+    if value is None:
+        return default
+    if isinstance(default, bool):
+        return value.lower() in ("1", "true", "yes")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+@dataclass
+class Config:
+    # Credentials (leave empty for manual login)
+    email: str = ""
+    password: str = ""
+    download_dir: str = "/home/nowass/Videos/Magisto"  # adjust to your needs
+    base_url: str = "https://www.magisto.com"  # change only for local benchmarks
+
+    # Browser - "chrome" or "brave"
+    # WARNING: Brave may have issues with ChromeDriver version - we recommend Chrome
+    browser_type: str = "chrome"
+
+    # "fast", "normal" or "slow" - see TIMING_PROFILES
+    timing_profile: str = "normal"
+    download_poll_interval: float = 0.5  # seconds between checks of download folder
+    download_completion_timeout: int = 1800  # max seconds to wait for running downloads at the end
+
+    # Library crawl:
+    #   "full"        - scroll to the very end of the video library
+    #   "incremental" - stop scrolling after incremental_known_streak already known
+    #                   videos in a row (newest videos are at the top) - for daily syncs
+    crawl_mode: str = "full"
+    incremental_known_streak: int = 20
+    max_scroll_tries: int = 3  # scrolls in a row without new videos before scrolling stops
+
+    # Library listing:
+    #   "dom" - scroll the library page and collect video links
+    #   "api" - find the JSON endpoint the web app loads the library from (DevTools network log)
+    #           and page through it directly with session cookies; falls back to "dom"
+    listing_mode: str = "dom"
+    api_max_pages: int = 1000  # safety limit for pages requested from library API
+
+    # State database (in download_dir) - remembers every video and its download status
+    state_db_file: str = "magisto_state.db"
+    state_commit_every: int = 20  # number of changes written in one transaction
+
+    # Metrics - timing of every step, written at the end and periodically during the run
+    metrics_json_file: str = "magisto_metrics.json"  # JSON summary, empty = disabled
+    metrics_prom_file: str = ""  # Prometheus textfile (node_exporter textfile collector), empty = disabled
+    metrics_export_interval: int = 60  # seconds between exports during long runs
+
+    # Session reuse - for fast and unattended (scheduled) runs
+    chrome_profile_dir: str = ""  # persistent Chrome profile folder (keeps login between runs)
+    cookie_jar_file: str = ""  # file for saving login cookies, e.g. "magisto_cookies.json"
+    chromedriver_cache_file: str = ".chromedriver_path"  # remembers ChromeDriver path (skips version check)
+
+    # Lean browser mode - headless Chrome without images, fonts, video previews and trackers.
+    # Headless browser can't be used for manual login - log in once with lean_browser = False
+    # and chrome_profile_dir or cookie_jar_file set, later runs reuse the saved session.
+    lean_browser: bool = False
+    lean_blocked_urls: list = field(default_factory=lambda: list(LEAN_BLOCKED_URLS))
+
+    # Parallel downloading - number of browser windows working through the video list
+    # 1 = classic serial mode, 3-4 is usually the most Magisto tolerates
+    parallel_workers: int = 1
+
+    # Governor - paces page loads and download starts (token bucket rate limit + AIMD concurrency).
+    # Starts with one request at a time and governor_rate requests/s, speeds up while Magisto answers
+    # within governor_latency_target seconds and halves both on slow pages, timeouts, HTTP 429/5xx
+    # or "Page not Found". parallel_workers is the upper limit of concurrency.
+    governor_enabled: bool = True
+    governor_rate: float = 1.0
+    governor_min_rate: float = 0.1
+    governor_max_rate: float = 10.0
+    governor_latency_target: float = 8.0
+
+    # Download mode:
+    #   "browser" - click Download and let Chrome download the file
+    #   "http"    - find the media URL on the video page and stream it directly
+    #               (with resume of interrupted transfers); falls back to browser
+    download_mode: str = "browser"
+    http_chunk_size: int = 1024 * 1024  # bytes read per chunk in http mode
+    http_max_retries: int = 3  # resume attempts for interrupted transfers in http mode
+    http_timeout: int = 30  # seconds to wait for server response in http mode
+
+    # Quality policy - rendition chosen in the download dialog (see quality.py):
+    #   "first"      - whatever Magisto offers first
+    #   "highest"    - highest resolution
+    #   "hd_max"     - highest resolution up to 720p
+    #   "budget:NGB" - highest resolution that keeps the download folder within N GB
+    # Projected and actual bytes are logged for every video and in the statistics.
+    quality_policy: str = "first"
+    quality_head_requests: bool = True  # ask server for size of rendition links the dialog shows no size for
+
+    # Pipeline - crawl, download and verify at the same time (run/download --pipeline).
+    # Downloads start within seconds in extra browsers, the crawl browser joins them when the
+    # crawl ends. Queues between stages hold at most pipeline_queue_size videos.
+    pipeline_mode: bool = False
+    pipeline_queue_size: int = 50
+
+    # Retries - failed videos come back later in the same run (exponential backoff with jitter,
+    # interleaved with fresh videos). Permanent failures ("Page not Found") and videos failing
+    # retry_max_attempts times go to the dead-letter list, re-run with "download --dead-letter".
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 20  # seconds before first retry, doubled with every attempt
+    retry_max_delay: float = 300
+
+    # Verification of downloaded files - content hash (SHA-256) and MP4/MOV structure check.
+    # Broken files are renamed to *.broken and downloaded again, duplicates are reported.
+    verify_downloads: bool = True  # verify new downloads at the end of every run
+    verify_workers: int = 0  # processes hashing files, 0 = one per CPU
+
+    # File layout - finished downloads are renamed to "{video_id}_{title}.{ext}" in subfolders:
+    #   "flat"      - keep Magisto's file names directly in download_dir
+    #   "id_prefix" - subfolder by first two characters of video ID (e.g. p1/)
+    #   "month"     - subfolder by month the video was created (e.g. 2019-07/)
+    # Files of earlier runs are moved with the "organize" command.
+    file_layout: str = "flat"
+    organize_title_length: int = 60  # max characters of title in file name
+
+    # Catalog - title, duration, creation date and thumbnail of every video (state database),
+    # updated by every crawl; the "catalog" command also saves thumbnails to download_dir/.thumbnails
+    catalog_thumbnail_workers: int = 8  # parallel thumbnail downloads
+
+    # Manifest - list of found videos with metadata (JSON lines), written by "collect"
+    manifest_file: str = "magisto_manifest.jsonl"
+    log_file: str = "magisto_downloader.log"
+
+    def __post_init__(self):
+        if self.timing_profile not in TIMING_PROFILES:
+            raise ValueError(f"Unknown timing profile '{self.timing_profile}' "
+                             f"(use one of {', '.join(TIMING_PROFILES)})")
+        parse_policy(self.quality_policy)
+        if self.file_layout not in FILE_LAYOUTS:
+            raise ValueError(f"Unknown file layout '{self.file_layout}' (use one of {', '.join(FILE_LAYOUTS)})")
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Defaults, overridden by MAGISTO_<NAME> environment variables, then by overrides"""
+        values = {}
+        for setting in dataclasses.fields(cls):
+            if setting.default is not dataclasses.MISSING:
+                values[setting.name] = env_setting(setting.name.upper(), setting.default)
+        values.update(overrides)
+        return cls(**values)
+
+    @property
+    def timings(self):
+        return TIMING_PROFILES[self.timing_profile]
+
+    @property
+    def state_db_path(self):
+        return os.path.join(self.download_dir, self.state_db_file)
@@ -0,0 +1,419 @@
+"""Library crawl - finds all videos by scrolling the library page (or through its API)"""
+import logging
+import re
+import time
+
+from selenium.webdriver.common.by import By
+
+from .locator import LOCATOR_POLL_INTERVAL, idle_sleep, wait_for_page_ready, wait_until
+from .metrics import metrics
+from .urls import is_valid_video_url, is_video_link
+
+# Number of video links, finished network requests and page height
+PAGE_LOAD_STATE_JS = """
+performance.setResourceTimingBufferSize(100000);  // default buffer stops at 250 requests
+return [
+    document.querySelectorAll("a[href*='/video/'], a[href*='/movie/']").length,
+    performance.getEntriesByType('resource').length,
+    document.body.scrollHeight
+];
+"""
+
+def parse_duration(text):
+    """Seconds of duration shown on video card ("0:45", "1:02:03"), None if not a duration"""
+    if not text or not re.fullmatch(r'\d+(:\d{1,2}){1,2}', text.strip()):
+        return None
+    seconds = 0
+    for part in text.strip().split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+# Selectors for video links on library page
+VIDEO_LINK_SELECTORS = [
+    "a[data-test-id='movie-card']",
+    "a[data-testid*='movie']", 
+    "a[data-testid*='video']",
+    ".video-card a",
+    ".movie-card a",
+    "a[href*='/video/']",
+    "a[href*='/movie/']",
+    "[data-test*='video'] a",
+    "[data-test*='movie'] a",
+    # More specific selectors for Magisto
+    "div[class*='video'] a",
+    "div[class*='movie'] a",
+    "article a[href*='/video/']",
+    ".thumbnail a",
+    ".video-thumbnail a"
+]
+
+# Collects all video links in ONE call: applies all selectors, removes duplicates,
+# keeps only video-like URLs and adds title, thumbnail, duration and date of each card.
+# With arguments[1] set only links not returned by an earlier such call are collected -
+# returned links are marked with their URL (cards re-used by the page for another video count as new).
+# Plain calls leave the marks alone.
+HARVEST_VIDEO_LINKS_JS = """
+const onlyNew = arguments[1];
+const selectors = arguments[0].filter(selector => {
+    try { document.querySelector(selector); return true; } catch (e) { return false; }
+});
+const videoPattern = /\\/(video|movie|watch|view)\\//;
+const seen = new Set();
+const results = [];
+if (!selectors.length) return results;
+
+for (const link of document.querySelectorAll(selectors.join(','))) {
+    const href = link.href;
+    if (!href || seen.has(href) || !videoPattern.test(href)) continue;
+    if (onlyNew) {
+        if (link.dataset.collectorSeen === href) continue;
+        link.dataset.collectorSeen = href;
+    }
+    seen.add(href);
+    
+    const card = link.closest("[class*='card'], [data-test-id], article, li") || link;
+    const titleElement = card.querySelector("[class*='title'], h1, h2, h3, h4");
+    const title = (link.getAttribute('title') || link.getAttribute('aria-label') ||
+                   (titleElement && titleElement.innerText) || link.innerText || '').trim();
+    
+    let thumbnail = null;
+    const image = link.querySelector('img') || card.querySelector('img');
+    if (image) {
+        thumbnail = image.currentSrc || image.src || image.getAttribute('data-src');
+    } else {
+        const match = /url\\(["']?([^"')]+)/.exec(getComputedStyle(card).backgroundImage || '');
+        if (match) thumbnail = match[1];
+    }
+    const durationElement = card.querySelector("[class*='duration'], [class*='length']");
+    const dateElement = card.querySelector("time[datetime], [data-created], [class*='date']");
+    const created = dateElement && (dateElement.getAttribute('datetime') || dateElement.getAttribute('data-created') ||
+                                    dateElement.innerText);
+    results.push({url: href, title: title.split('\\n')[0].slice(0, 200), thumbnail: thumbnail,
+                  duration: durationElement ? durationElement.innerText.trim() : null,
+                  created: created ? created.trim() : null});
+}
+return results;
+"""
+
+# Forget which links were returned - the next only-new harvest collects every link again
+CLEAR_SEEN_MARKS_JS = """
+for (const link of document.querySelectorAll('[data-collector-seen]')) delete link.dataset.collectorSeen;
+"""
+
+class LibraryCrawler:
+    """Collects URLs (and title, thumbnail, ...) of all videos in the library"""
+    
+    def __init__(self, driver, config, state_store):
+        self.driver = driver
+        self.config = config
+        self.state_store = state_store
+        self.video_metadata = {}  # video URL -> title, thumbnail, ... of every found video
+    
+    def load_all_videos(self):
+        """Load all videos using infinite scrolling"""
+        return list(self.iter_videos())
+    
+    def iter_videos(self):
+        """Yield video URLs as soon as they are found - after every scroll step (or API page)
+        
+        Found videos (and their metadata for the catalog) are stored in the state database
+        right away, so an interrupted crawl doesn't lose them.
+        """
+        logging.info("[2/5] Loading videos...")
+        found = set()
+        for batch in self.iter_video_batches():
+            new_urls = [url for url in batch if url not in found]
+            if not new_urls:
+                continue
+            found.update(new_urls)
+            self.state_store.add_discovered(new_urls)
+            self.state_store.update_catalog({url: self.video_metadata.get(url, {}) for url in new_urls})
+            yield from new_urls
+    
+    def iter_video_batches(self):
+        """Yield lists of newly found video URLs"""
+        if self.config.listing_mode == "api":
+            from .api_listing import iter_videos_via_api
+            found_any = False
+            try:
+                for batch in iter_videos_via_api(self):
+                    found_any = True
+                    yield batch
+                if found_any:
+                    return
+            except Exception as e:
+                logging.warning(f"⚠️ API listing failed: {e}")
+            logging.info("⚠️ Falling back to scrolling the library page...")
+        
+        current_url = self.driver.current_url
+        logging.info(f"Current URL after login: {current_url}")
+        
+        # First check if we're already on videos page
+        if '/video/' in current_url or '/my-movies' in current_url or 'mine' in current_url:
+            logging.info("✅ Already on videos page! Skipping navigation.")
+            # Try to find videos on current page
+            if self.check_for_videos_on_page():
+                logging.info("✅ Videos found on current page")
+            else:
+                logging.info("⚠️ No videos on current page, trying other URLs...")
+                if not self.try_alternative_video_urls():
+                    return
+        else:
+            # If not on videos page, try to navigate
+            logging.info("📍 Navigating to videos page...")
+            if not self.try_alternative_video_urls():
+                return
+        
+        # Infinite scrolling on current page
+        yield from self.iter_scroll_batches()
+    
+    def check_for_videos_on_page(self):
+        """Check if there are videos on current page"""
+        try:
+            video_selectors = [
+                "a[data-test-id='movie-card']",
+                "a[data-testid*='movie']",
+                "a[data-testid*='video']",
+                ".video-card",
+                ".movie-card",
+                "a[href*='/video/']",
+                "a[href*='/movie/']",
+                "[data-test*='video']",
+                "[data-test*='movie']"
+            ]
+            
+            for selector in video_selectors:
+                try:
+                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    if elements:
+                        logging.info(f"   → Found {len(elements)} videos using selector: {selector}")
+                        return True
+                except:
+                    continue
+            
+            return False
+        except Exception as e:
+            logging.warning(f"Error checking for videos: {e}")
+            return False
+    
+    def try_alternative_video_urls(self):
+        """Try different URLs for videos page - returns True when a page with videos is open"""
+        video_urls_to_try = [
+            # Don't try current URL again if already there
+            None,  # placeholder for current URL
+            f"{self.config.base_url}/video/mine",
+            f"{self.config.base_url}/my-movies",
+            f"{self.config.base_url}/videos",
+            f"{self.config.base_url}/dashboard",
+            f"{self.config.base_url}/library",
+            f"{self.config.base_url}/home"
+        ]
+        
+        current_url = self.driver.current_url
+        
+        # If already on one of target URLs, start scrolling directly
+        for target_url in video_urls_to_try[1:]:  # Skip None placeholder
+            if target_url and target_url in current_url:
+                logging.info(f"✅ Already on target URL: {current_url}")
+                return True
+        
+        # Try navigating to different URLs
+        for idx, url in enumerate(video_urls_to_try[1:], 1):  # Skip None placeholder
+            try:
+                logging.info(f"🔄 Trying URL {idx}: {url}")
+                self.driver.get(url)
+                wait_for_page_ready(self.driver, self.config.timings["page_load"])
+                # Library is rendered by scripts - give it time to show first videos
+                wait_until(lambda: self.driver.execute_script(PAGE_LOAD_STATE_JS)[0] > 0,
+                           self.config.timings["video_page"])
+                
+                # Check if page loaded successfully
+                if "error" in self.driver.title.lower() or "not found" in self.driver.page_source.lower():
+                    logging.warning(f"   ❌ URL {url} returned error")
+                    continue
+                
+                # Check if there are videos on page
+                if self.check_for_videos_on_page():
+                    logging.info(f"✅ Successfully loaded on URL: {url}")
+                    return True
+                else:
+                    logging.info(f"   ⚠️ No videos on URL {url}")
+                    
+            except Exception as e:
+                logging.warning(f"   ❌ URL {url} failed: {e}")
+                continue
+        
+        logging.error("❌ Failed to load any videos page")
+        return False
+    
+    def wait_for_new_cards(self, last_state):
+        """Wait until new videos appear or network goes idle (max scroll timeout of timing profile)
+        
+        Returns new page state (links, requests, height).
+        """
+        deadline = time.time() + self.config.timings["scroll"]
+        state = last_state
+        last_activity = time.time()
+        
+        while time.time() < deadline:
+            idle_sleep(LOCATOR_POLL_INTERVAL)
+            new_state = self.driver.execute_script(PAGE_LOAD_STATE_JS)
+            
+            if new_state[0] > last_state[0] or new_state[2] > last_state[2]:
+                return new_state  # new cards appeared
+            if new_state[1] != state[1]:
+                last_activity = time.time()
+            elif time.time() - last_activity >= self.config.timings["network_idle"]:
+                return new_state  # network idle - nothing more is coming
+            state = new_state
+        
+        return state
+    
+    def harvest_video_links(self, only_new=False):
+        """Collect valid video URLs (with title and thumbnail) using one browser call
+        
+        only_new=True skips links returned by an earlier call (cards added since then).
+        """
+        cards = self.driver.execute_script(HARVEST_VIDEO_LINKS_JS, VIDEO_LINK_SELECTORS, only_new) or []
+        
+        video_urls = []
+        invalid_urls = []
+        for card in cards:
+            url = card["url"]
+            if not is_video_link(url):
+                continue
+            if not is_valid_video_url(url):
+                invalid_urls.append(url)
+                continue
+            video_urls.append(url)
+            self.video_metadata[url] = {"title": card.get("title") or None, "thumbnail": card.get("thumbnail"),
+                                        "duration": parse_duration(card.get("duration")),
+                                        "created": card.get("created") or None}
+        
+        if invalid_urls:
+            logging.warning(f"⚠️ Filtered out {len(invalid_urls)} invalid URLs:")
+            for invalid_url in invalid_urls[:5]:  # Show only first 5
+                logging.warning(f"   - {invalid_url}")
+        
+        return video_urls
+    
+    def iter_scroll_batches(self):
+        """Perform infinite scrolling - yields video URLs of cards added by each scroll step"""
+        logging.info("🔄 Starting infinite scrolling...")
+        
+        known_urls = set()
+        if self.config.crawl_mode == "incremental":
+            known_urls = self.state_store.known_urls()
+            logging.info(f"   ⚡ Incremental crawl - stopping after {self.config.incremental_known_streak} "
+                         f"known videos in a row ({len(known_urls)} videos known)")
+        
+        # Infinite scrolling - from a clean slate, earlier harvests of this page must not hide links
+        self.driver.execute_script(CLEAR_SEEN_MARKS_JS)
+        video_urls = []
+        known_streak = longest_known_streak = 0
+        last_state = self.driver.execute_script(PAGE_LOAD_STATE_JS)
+        scroll_tries = 0
+        
+        while True:
+            with metrics.timer("validation_seconds"):
+                new_urls = self.harvest_video_links(only_new=True)
+            if new_urls:
+                video_urls.extend(new_urls)
+                yield new_urls
+            
+            if known_urls:
+                # New cards continue the page order - streak goes on across scroll steps
+                for url in new_urls:
+                    known_streak = known_streak + 1 if url in known_urls else 0
+                    longest_known_streak = max(longest_known_streak, known_streak)
+                if longest_known_streak >= self.config.incremental_known_streak:
+                    logging.info(f"   ⚡ Found {longest_known_streak} known videos in a row - rest of library is already known")
+                    break
+            if scroll_tries >= self.config.max_scroll_tries:
+                break
+            
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            new_state = self.wait_for_new_cards(last_state)
+            
+            if new_state[0] <= last_state[0] and new_state[2] <= last_state[2]:
+                scroll_tries += 1
+                logging.info(f"   📜 Scroll attempt {scroll_tries}/{self.config.max_scroll_tries}")
+            else:
+                scroll_tries = 0
+                logging.info(f"   📜 Loading more videos... ({new_state[0]} links, {len(video_urls)} videos so far)")
+            last_state = new_state
+        
+        logging.info("[3/5] ✅ Scrolling completed")
+        
+        logging.info(f"🎬 Found {len(video_urls)} unique videos")
+        
+        # Show some example URLs for debugging
+        if video_urls:
+            logging.info("📋 Examples of found video URLs:")
+            for i, url in enumerate(video_urls[:5]):  # Show first 5
+                logging.info(f"   {i+1}. {url}")
+            if len(video_urls) > 5:
+                logging.info(f"   ... and {len(video_urls) - 5} more videos")
+        else:
+            # Debug info if no videos found
+            logging.warning("⚠️ No videos found! Debug info:")
+            
+            # Try to find all links on page
+            all_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href]")
+            logging.info(f"   Total links found on page: {len(all_links)}")
+            
+            # Show first 10 links for debugging
+            for i, link in enumerate(all_links[:10]):
+                try:
+                    href = link.get_attribute("href")
+                    text = link.text.strip()[:50]  # First 50 characters of text
+                    logging.info(f"   {i+1}. {href} (text: '{text}')")
+                except:
+                    continue
+        
+    def log_debug_info(self):
+        """Log what is on the page when no videos were found"""
+        logging.error("❌ No videos found.")
+        logging.info("🔍 DEBUG INFO:")
+        logging.info(f"   Current URL: {self.driver.current_url}")
+        logging.info(f"   Page title: {self.driver.title}")
+        
+        # Output some page elements for debugging
+        try:
+            # Try to find all links on page
+            all_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href]")
+            logging.info(f"   Total links found on page: {len(all_links)}")
+            
+            # Find links with 'video' in URL
+            video_links = [link for link in all_links if '/video/' in link.get_attribute("href")]
+            logging.info(f"   Of those {len(video_links)} contain '/video/' in URL")
+            
+            # Show first 10 video links
+            logging.info("   Examples of found '/video/' links:")
+            for i, link in enumerate(video_links[:10]):
+                try:
+                    href = link.get_attribute("href")
+                    text = link.text.strip()[:30] if link.text.strip() else "No text"
+                    logging.info(f"     {i+1}. {href} ('{text}')")
+                except:
+                    continue
+            
+            # Try to find any images that could be thumbnails
+            images = self.driver.find_elements(By.CSS_SELECTOR, "img")
+            logging.info(f"   Found {len(images)} images on page")
+            
+            # Save screenshot for debugging
+            try:
+                screenshot_path = "debug_page_screenshot.png"
+                self.driver.save_screenshot(screenshot_path)
+                logging.info(f"   📸 Screenshot saved: {screenshot_path}")
+            except:
+                pass
+            
+        except Exception as e:
+            logging.warning(f"   Error during debugging: {e}")
+        
+        logging.info("💡 SUGGESTIONS:")
+        logging.info("   1. Check manually if you can see videos in browser")
+        logging.info("   2. Maybe Magisto changed page structure")
+        logging.info("   3. Try waiting longer for page to load")
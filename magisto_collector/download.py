@@ -0,0 +1,598 @@
+"""Downloading videos - skip detection, Download button, popup, retries and parallel workers"""
+import logging
+import os
+import threading
+import time
+
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchWindowException, TimeoutException,
+                                        WebDriverException)
+from urllib3.exceptions import MaxRetryError, ProtocolError
+
+from .browser import add_session_cookies, copy_session_cookies, get_http_session, setup_browser_driver
+from .governor import Governor, throttle_status
+from .http_download import resolve_media_url, stream_download
+from .index import DownloadIndex
+from .locator import find_first, wait_for_page_ready
+from .metrics import RunMetrics, metrics
+from .organizer import organize_file
+from .quality import QualityPolicy, find_renditions, format_size, head_size
+from .retry import (DOWNLOAD_STALLED, DRIVER_CRASH, ERROR, NO_BUTTON, PAGE_NOT_FOUND, TIMEOUT, RetryScheduler,
+                    VideoFailure)
+from .tracker import DownloadTicket, DownloadTracker
+from .urls import get_video_id_from_url
+
+# FIXED selectors for download button
+DOWNLOAD_SELECTORS = [
+    "//span[contains(text(),'Download')]",  # ✅ Main selector - SPAN element
+    "//button[contains(text(),'Download')]",
+    "//button[contains(text(),'download')]",
+    "//a[contains(text(),'Download')]",
+    "//a[contains(text(),'download')]",
+    "//button[contains(@class,'download')]",
+    "//a[contains(@class,'download')]",
+    "//span[contains(@class,'download')]",  # Added for span elements
+    "[data-test-id*='download']",
+    "[data-testid*='download']",
+    ".download-btn",
+    ".download-button"
+]
+
+# Video page is ready when Download button or error message is shown
+PAGE_NOT_FOUND_SELECTOR = "//*[contains(text(),'Page not Found')]"
+VIDEO_PAGE_READY_SELECTORS = DOWNLOAD_SELECTORS + [PAGE_NOT_FOUND_SELECTOR]
+
+# FIXED selectors for confirmation popup for older videos
+CONFIRMATION_SELECTORS = [
+    "//button[contains(text(),'Download')]",  # Second download button in popup
+    "//span[contains(text(),'Download')]",   # Second download span in popup
+    "//button[contains(text(),'Confirm')]",
+    "//button[contains(text(),'OK')]",
+    "//button[contains(text(),'Yes')]",
+    "//div[@class='modal']//button[contains(text(),'Download')]",
+    "//div[@class='popup']//button[contains(text(),'Download')]",
+    "//div[@class='dialog']//button[contains(text(),'Download')]"
+]
+
+# Possible selectors for video name in video widget
+VIDEO_NAME_SELECTORS = [
+    "h1",  # Often main heading
+    "h2",
+    "h3",
+    ".video-title",
+    ".title",
+    ".video-name",
+    ".media-title",
+    "[data-test-id='video-title']",
+    "[data-testid='video-title']",
+    # Search for text near download button
+    "//span[contains(text(),'Download')]/../..//h1",
+    "//span[contains(text(),'Download')]/../..//h2",
+    "//span[contains(text(),'Download')]/../..//h3",
+    "//span[contains(text(),'Download')]/../preceding-sibling::*//*[string-length(text()) > 3]",
+    "//span[contains(text(),'Download')]/../following-sibling::*//*[string-length(text()) > 3]"
+]
+
+# Videos with these names are always downloaded again (for better naming)
+GENERIC_VIDEO_NAMES = ['untitled', 'bez názvu', 'no title', 'no name', 'untitled video', 'new video', 'video', 'my video']
+
+# Error messages of a dead browser session
+DRIVER_CRASH_MARKERS = ["invalid session id", "chrome not reachable", "disconnected", "session deleted",
+                        "no such window", "target window already closed", "tab crashed"]
+
+def classify_failure(error):
+    """VideoFailure with failure class for exception raised while processing video"""
+    if isinstance(error, VideoFailure):
+        return error
+
+    lines = str(error).strip().splitlines()
+    message = f"{type(error).__name__}: {lines[0] if lines else ''}"
+    if (isinstance(error, (InvalidSessionIdException, NoSuchWindowException, ConnectionError,
+                           MaxRetryError, ProtocolError)) or
+            (isinstance(error, WebDriverException) and
+             any(marker in message.lower() for marker in DRIVER_CRASH_MARKERS))):
+        return VideoFailure(DRIVER_CRASH, message)
+    if isinstance(error, TimeoutException):
+        return VideoFailure(TIMEOUT, message)
+    return VideoFailure(ERROR, message)
+
+def is_generic_name(video_name):
+    """Generic names ("Untitled", ...) and very short names (1-2 chars) never identify a video"""
+    return video_name.lower() in GENERIC_VIDEO_NAMES or len(video_name.strip()) <= 2
+
+def is_video_title(title):
+    """Filter unwanted text found instead of video name"""
+    return bool(title and len(title) > 2 and
+                "Magisto" not in title and
+                "Download" not in title and
+                "Page not Found" not in title and
+                not title.isdigit() and  # Is not just a number
+                ":" not in title)  # Is not a time code
+
+def get_video_name_from_widget(driver):
+    """Get video name directly from video widget (where download button is)"""
+    try:
+        _, _, title = find_first(driver, VIDEO_NAME_SELECTORS, accept=is_video_title)
+        if title:
+            logging.info(f"   📝 Found video name: '{title}'")
+            return title
+
+        logging.warning("   ⚠️ Could not find video name in widget")
+        return None
+
+    except Exception as e:
+        logging.error(f"   ❌ Error getting video name: {e}")
+        return None
+
+class Downloader:
+    """Downloads videos one by one (or with parallel browser workers), skipping downloaded ones
+
+    Call start() before processing videos and stop() at the end - it waits for
+    running browser downloads and returns the number of unfinished ones.
+    """
+
+    def __init__(self, config, state_store):
+        self.config = config
+        self.state_store = state_store
+        self.download_index = DownloadIndex(config.download_dir)
+        self.tracker = DownloadTracker(config.download_dir, on_complete=self.on_download_complete,
+                                       poll_interval=config.download_poll_interval)
+        self.governor = Governor(max_concurrency=config.parallel_workers, rate=config.governor_rate,
+                                 min_rate=config.governor_min_rate, max_rate=config.governor_max_rate,
+                                 latency_target=config.governor_latency_target, enabled=config.governor_enabled)
+        self.session_cookies = []  # login cookies for browsers restarted after a crash
+        self.restarted_drivers = []
+        self._drivers_lock = threading.Lock()
+        # One click at a time waits for its download to start - the tracker matches new files
+        # to the only ticket without a file, so parallel workers can't swap their videos
+        self._click_lock = threading.Lock()
+        self.completion_listeners = []  # called with every finished DownloadTicket (tracker thread)
+        self.video_metadata = {}  # video URL -> title, created, ... from crawl or manifest (if known)
+        self.catalog = {}  # video URL -> catalog entry from earlier crawls (see catalog.py)
+        self.quality = QualityPolicy(config.quality_policy)
+        self.video_titles = {}  # video URL -> name shown in video widget, for organized file names
+
+    def start(self):
+        # Scan download folder once - skip detection then works from memory
+        self.download_index.build()
+        self.catalog = self.state_store.catalog_entries()
+        counts = self.state_store.status_counts()
+        pending = sum(count for status, count in counts.items() if status not in ("done", "dead"))
+        self.quality.start(self.state_store.done_bytes(), pending)
+        self.tracker.start()
+
+    def stop(self):
+        unfinished = self.wait_for_running_downloads()
+        self.tracker.stop()
+        for driver in self.restarted_drivers:
+            try:
+                driver.quit()
+            except:
+                pass
+        return unfinished
+
+    def is_video_already_downloaded(self, video_url):
+        """Check if video is already downloaded using only its URL (no page needed)"""
+        video_id = get_video_id_from_url(video_url)
+        if not video_id:
+            return False, None
+
+        # Method 1: Search by video ID in filename
+        existing_file = self.download_index.find_by_video_id(video_id)
+        if existing_file:
+            return True, existing_file
+
+        # Method 2: Search by URL in state database
+        state = self.state_store.get(video_url)
+        if state and state["status"] == "done" and state["filename"]:
+            full_path = os.path.join(self.config.download_dir, state["filename"])
+            if os.path.exists(full_path):
+                return True, full_path
+
+        # Method 3 without loading the page: name from catalog
+        title = self.catalog_title(video_url)
+        if title and not is_generic_name(title) and self.name_search_needed():
+            existing_file, match_type = self.download_index.find_by_name(title)
+            if existing_file:
+                logging.info(f"   ✅ Found by {match_type} of catalog title '{title}': '{os.path.basename(existing_file)}'")
+                return True, existing_file
+
+        return False, None
+
+    def video_info(self, video_url):
+        """Metadata of video from this run's listing or the catalog"""
+        return self.video_metadata.get(video_url) or self.catalog.get(video_url) or {}
+
+    def catalog_title(self, video_url):
+        """Title from listing or catalog - None if it is a duration, label or other non-title text"""
+        title = self.video_info(video_url).get("title")
+        return title if is_video_title(title) else None
+
+    def name_search_needed(self):
+        """Files without video ID in their name (Magisto's names) may exist"""
+        # In organized layouts every file in a subfolder is named with its video ID - method 1 finds it
+        return self.config.file_layout == "flat" or self.download_index.top_level_count > 0
+
+    def is_video_already_downloaded_by_name(self, driver, video_url):
+        """Check if video is already downloaded - enhanced version using widget name"""
+        if not get_video_id_from_url(video_url):
+            return False, None
+
+        # Methods 1 - 3: video ID, state database and catalog title
+        already_downloaded, existing_file = self.is_video_already_downloaded(video_url)
+        if already_downloaded:
+            return True, existing_file
+
+        # Method 4: Check by widget name - the catalog title may be cut or missing
+        logging.info(f"   🔍 Getting video name from widget...")
+
+        # Page is already loaded, just get the name
+        video_name = get_video_name_from_widget(driver)
+        if video_name:
+            self.video_titles[video_url] = video_name
+
+        # NEW: If video has generic name ("Untitled"), always download
+        if video_name and is_generic_name(video_name):
+            logging.info(f"   ⚠️ Video has generic name '{video_name}' - will be downloaded again for better naming")
+            logging.info(f"   💡 Generic names like 'Untitled', 'My video' are never skipped")
+            return False, None
+
+        if not self.name_search_needed():
+            return False, None
+
+        if video_name and video_name == self.catalog_title(video_url):
+            logging.info(f"   ❌ No file found for name '{video_name}' (searched as catalog title)")
+        elif video_name:
+            logging.info(f"   🔍 Searching for files with name '{video_name}' (length: {len(video_name)} chars)...")
+
+            existing_file, match_type = self.download_index.find_by_name(video_name)
+            if existing_file:
+                logging.info(f"   ✅ Found by {match_type}: '{os.path.basename(existing_file)}'")
+                return True, existing_file
+
+            logging.info(f"   ❌ No file found for name '{video_name}' (even truncated)")
+        else:
+            logging.warning("   ⚠️ Could not get video name from widget")
+
+        return False, None
+
+    def on_download_complete(self, ticket):
+        """Organize and log finished download, remember it for skip detection"""
+        if self.config.file_layout != "flat":
+            metadata = self.video_info(ticket.video_url)
+            title = self.catalog_title(ticket.video_url) or self.video_titles.pop(ticket.video_url, None)
+            try:
+                ticket.file_path = organize_file(self.config, get_video_id_from_url(ticket.video_url),
+                                                 ticket.file_path, title, metadata.get("created"))
+            except OSError as e:
+                logging.warning(f"     ⚠️ Could not move {os.path.basename(ticket.file_path)} to organized folder: {e}")
+
+        size_mb = ticket.bytes / (1024**2)
+        speed_mb = ticket.throughput / (1024**2)
+        logging.info(f"     ✅ Download finished: {os.path.relpath(ticket.file_path, self.config.download_dir)} "
+                     f"({size_mb:.1f} MB in {ticket.duration:.1f}s, {speed_mb:.2f} MB/s)")
+
+        metrics.observe("download_completion_seconds", ticket.duration)
+        metrics.observe("download_bytes_per_second", ticket.throughput, RunMetrics.THROUGHPUT_BUCKETS)
+        metrics.inc("downloaded_bytes", ticket.bytes)
+        metrics.inc("downloads_completed")
+        projected = self.quality.record_actual(ticket.video_url, ticket.bytes)
+        if projected:
+            logging.info(f"     📐 Projected {format_size(projected)}, got {format_size(ticket.bytes)} "
+                         f"({ticket.bytes / projected:.0%})")
+
+        # Remember download for future skip detection
+        self.state_store.mark_done(ticket.video_url, ticket.file_path)
+        self.download_index.add(ticket.file_path)
+        for listener in list(self.completion_listeners):
+            listener(ticket)
+
+    def download_via_http(self, driver, video_url, download_btn):
+        """Download video directly over HTTP - returns False if media URL is not available"""
+        media_url = resolve_media_url(driver, download_btn)
+        if not media_url:
+            logging.info("     → Media URL not found on page, using browser download")
+            return False
+
+        logging.info(f"     → Streaming {media_url}")
+        self.governor.throttle()
+        ticket = DownloadTicket(video_url)
+        session = get_http_session(driver, self.config.parallel_workers * 2)
+        ticket.file_path, ticket.bytes = stream_download(session, media_url, video_url, self.config.download_dir,
+                                                         self.config, tracker=self.tracker)
+        ticket.completed_at = time.time()
+        self.tracker.complete_external(ticket)
+        return True
+
+    def download_video(self, driver, video_url, video_index, total_videos):
+        """Click Download on the already loaded video page and wait until download starts"""
+        timings = self.config.timings
+        logging.info(f"[4/5] ({video_index}/{total_videos}) Visiting {video_url}")
+
+        with metrics.timer("button_wait_seconds"):
+            download_btn, _, _ = find_first(driver, DOWNLOAD_SELECTORS, timeout=timings["download_button"],
+                                            clickable=True)
+        if not download_btn:
+            raise VideoFailure(NO_BUTTON, "download button not found")
+
+        self.state_store.mark_downloading(video_url)
+
+        if self.config.download_mode == "http":
+            try:
+                if self.download_via_http(driver, video_url, download_btn):
+                    self.quality.record_choice(video_url, None)
+                    return
+            except Exception as e:
+                if throttle_status(e):
+                    self.governor.congestion(f"HTTP {throttle_status(e)}")
+                logging.warning(f"     ⚠️ Direct download failed ({e}), using browser download")
+
+        with self.governor.slot(), self._click_lock:
+            # Register download before clicking so the tracker can match the new file
+            ticket = self.tracker.begin(video_url)
+            try:
+                download_btn.click()
+                logging.info("     → Clicked Download button...")
+
+                # Check if popup appeared (older videos) - skip the button we already clicked
+                confirmation_btn, _, _ = find_first(driver, CONFIRMATION_SELECTORS, timeout=timings["popup"],
+                                                    clickable=True, exclude=download_btn)
+                # Quality options only exist in the popup - the default policy just confirms it
+                rendition = None
+                if confirmation_btn and self.quality.name != "first":
+                    rendition = self.choose_rendition(driver, video_url, confirmation_btn)
+                else:
+                    self.quality.record_choice(video_url, None)
+                if rendition:
+                    rendition.element.click()
+                    logging.info(f"     → Chose {rendition.label} ({format_size(rendition.size)}"
+                                 f"{', ' + rendition.size_source if rendition.size_source else ''}) "
+                                 f"- quality policy '{self.config.quality_policy}'")
+                    if not rendition.starts_download and rendition.element != confirmation_btn:
+                        confirmation_btn.click()
+                        logging.info("     → Confirmed in popup dialog...")
+                elif confirmation_btn:
+                    confirmation_btn.click()
+                    logging.info("     → Confirmed in popup dialog...")
+                else:
+                    logging.info("     → No popup detected")
+
+                # Move on as soon as the download starts - completion is confirmed by tracker
+                wait_start = time.time()
+                started = self.tracker.wait_started(ticket, timings["download_start"])
+                metrics.inc("idle_seconds", time.time() - wait_start)
+            except Exception:
+                # A ticket left behind would claim the file of the next download
+                self.tracker.cancel(ticket)
+                raise
+            if not started:
+                started = not self.tracker.expire(ticket)
+
+        if started:
+            self.governor.success(time.time() - ticket.clicked_at)
+            metrics.observe("download_start_seconds", time.time() - ticket.clicked_at)
+            if ticket.completed.is_set():
+                logging.info(f"     → Download already finished: {os.path.basename(ticket.file_path)}")
+            else:
+                logging.info("     → Download started, continuing with next video...")
+        else:
+            metrics.inc("downloads_not_started_in_time")
+            self.governor.congestion("download not started in time")
+            # The retry finds the file by name if the download still arrives meanwhile
+            raise VideoFailure(DOWNLOAD_STALLED, f"download not started within {timings['download_start']}s")
+
+    def choose_rendition(self, driver, video_url, confirmation_btn):
+        """Quality option to click according to quality policy - None if the dialog offers no choice"""
+        renditions = find_renditions(driver, confirmation_btn)
+        if len(renditions) < 2:
+            self.quality.record_choice(video_url, None)
+            return None
+
+        duration = self.video_info(video_url).get("duration")
+        if self.config.quality_head_requests:
+            # Sizes of all options only matter for the budget - otherwise just the chosen one
+            unknown = [rendition for rendition in renditions if rendition.size is None and rendition.href]
+            if unknown and not self.quality.needs_sizes:
+                chosen = self.quality.choose(renditions)
+                unknown = [chosen] if chosen in unknown else []
+            if unknown:
+                session = get_http_session(driver, self.config.parallel_workers * 2)
+                for rendition in unknown:
+                    rendition.size = head_size(session, rendition.href, self.config.http_timeout)
+                    rendition.size_source = "HEAD" if rendition.size is not None else None
+        for rendition in renditions:
+            rendition.estimate(duration)
+
+        chosen = self.quality.choose(renditions)
+        self.quality.record_choice(video_url, chosen)
+        metrics.inc(f"rendition_{chosen.height}p")
+        return chosen
+
+    def process_video(self, driver, url, video_index, total_videos):
+        """Process one video URL - returns ("downloaded" / "skipped" / "failed", VideoFailure or None)
+
+        The video page is loaded at most once and skip detection runs only once -
+        videos found by ID or in state database are skipped without loading the page at all.
+        """
+        timings = self.config.timings
+        video_start = time.time()
+        failure = None
+        try:
+            with metrics.timer("skip_check_seconds"):
+                already_downloaded, existing_file = self.is_video_already_downloaded(url)
+
+            if not already_downloaded:
+                # Load video page - reused for name check and download button
+                with metrics.timer("page_load_seconds"), self.governor.slot():
+                    load_start = time.time()
+                    driver.get(url)
+                    # Wait for page to load - video widget shows the Download button (or error page)
+                    wait_for_page_ready(driver, timings["page_load"])
+                    _, selector, _ = find_first(driver, VIDEO_PAGE_READY_SELECTORS, timeout=timings["video_page"])
+                    load_seconds = time.time() - load_start
+                metrics.inc("page_loads")
+                if selector == PAGE_NOT_FOUND_SELECTOR:
+                    # Throttled sessions also get error pages - slow down in case it's not a deleted video
+                    self.governor.congestion("Page not Found")
+                    raise VideoFailure(PAGE_NOT_FOUND, "Magisto shows 'Page not Found'")
+                if selector:
+                    self.governor.success(load_seconds)
+                else:
+                    self.governor.congestion("video page not ready in time")
+                with metrics.timer("skip_check_seconds"):
+                    already_downloaded, existing_file = self.is_video_already_downloaded_by_name(driver, url)
+
+            if already_downloaded:
+                logging.info(f"[4/5] ({video_index}/{total_videos}) ⏭️  SKIPPING - already downloaded: {os.path.basename(existing_file)}")
+                # Next run finds it in state database without loading the page
+                self.state_store.mark_done(url, existing_file)
+                result = "skipped"
+            else:
+                self.download_video(driver, url, video_index, total_videos)
+                result = "downloaded"
+        except Exception as e:
+            failure = classify_failure(e)
+            if failure.error_class == TIMEOUT:
+                self.governor.congestion("timeout")
+            logging.error(f"     ❌ Error processing video {url}: {failure}")
+            metrics.inc(f"failures_{failure.error_class}")
+            result = "failed"
+
+        metrics.inc(f"videos_{result}")
+        metrics.observe("video_seconds", time.time() - video_start)
+        return result, failure
+
+    def wait_for_running_downloads(self):
+        """Wait until tracked downloads finish, return number of unfinished ones
+
+        Unfinished downloads are marked as stalled - the next run tries them again.
+        """
+        running = self.tracker.running_count()
+        if running:
+            logging.info(f"⏳ Waiting for {running} running downloads to finish...")
+
+        unfinished = self.tracker.wait_all(self.config.download_completion_timeout)
+        for ticket in unfinished:
+            logging.warning(f"   ⚠️ Download not finished: {ticket.video_url} "
+                            f"({ticket.bytes / (1024**2):.1f} MB after {ticket.duration:.0f}s)")
+            self.state_store.mark_failed(ticket.video_url, f"download not finished after {ticket.duration:.0f}s",
+                                         DOWNLOAD_STALLED)
+            # Reported once - a later wait (e.g. in stop()) doesn't wait for it again
+            self.tracker.cancel(ticket)
+        return len(unfinished)
+
+    def replace_driver(self, crashed_driver):
+        """Start new browser with the login cookies after a crash - None if it can't be started"""
+        try:
+            crashed_driver.quit()
+        except:
+            pass
+
+        try:
+            new_driver = setup_browser_driver(self.config)
+            add_session_cookies(new_driver, self.session_cookies, self.config.base_url)
+        except Exception as e:
+            logging.error(f"   ❌ Could not restart browser: {e}")
+            return None
+
+        with self._drivers_lock:
+            self.restarted_drivers.append(new_driver)
+        metrics.inc("driver_restarts")
+        logging.info("   ♻️  Browser restarted after crash")
+        return new_driver
+
+    def run(self, driver, video_urls):
+        """Process all videos (serial or with parallel workers), return counts per result
+
+        Failed videos are retried later in the run (interleaved with fresh ones),
+        permanent failures and videos out of retries go to the dead-letter list.
+        """
+        logging.info(f"🚀 Starting download of {len(video_urls)} videos...")
+        logging.info("   (Already downloaded videos will be automatically skipped)")
+
+        self.session_cookies = driver.get_cookies()
+        scheduler = RetryScheduler(video_urls, self.state_store, self.config.retry_max_attempts,
+                                   self.config.retry_base_delay, self.config.retry_max_delay)
+
+        if self.config.parallel_workers > 1:
+            return self.run_parallel_downloads(driver, scheduler, self.config.parallel_workers)
+
+        stats = {"downloaded": 0, "skipped": 0, "failed": 0, "retried": 0}
+        self.download_worker(1, driver, scheduler, stats, threading.Lock())
+        return stats
+
+    def download_worker(self, worker_id, worker_driver, scheduler, stats, stats_lock):
+        """Process videos handed out by the scheduler until all work is done"""
+        while True:
+            item = scheduler.next_item()
+            if item is None:
+                break
+
+            url, attempt = item
+            if attempt > 1:
+                logging.info(f"🔁 Attempt {attempt}/{scheduler.max_attempts}: {url}")
+            result, failure = self.process_video(worker_driver, url, scheduler.index[url], scheduler.total)
+
+            if failure is None:
+                scheduler.succeeded(url)
+            elif scheduler.failed(url, attempt, failure):
+                result = "retried"
+            with stats_lock:
+                stats[result] += 1
+
+            if failure is not None and failure.error_class == DRIVER_CRASH:
+                worker_driver = self.replace_driver(worker_driver)
+                if worker_driver is None:
+                    logging.error(f"   ❌ Worker {worker_id} stopped - remaining videos are left for the next run")
+                    break
+
+        if self.config.parallel_workers > 1:
+            logging.info(f"   🏁 Worker {worker_id} finished")
+
+    def start_worker_browsers(self, driver, count, first_worker_id=2):
+        """Open additional browsers sharing the login of the main one"""
+        worker_drivers = []
+        for worker_id in range(first_worker_id, first_worker_id + count):
+            try:
+                worker_driver = setup_browser_driver(self.config)
+                copied = copy_session_cookies(driver, worker_driver, self.config.base_url)
+                logging.info(f"   👷 Worker {worker_id} started ({copied} session cookies copied)")
+                worker_drivers.append(worker_driver)
+            except Exception as e:
+                logging.error(f"   ❌ Could not start worker {worker_id}: {e}")
+        return worker_drivers
+
+    def run_parallel_downloads(self, driver, scheduler, num_workers):
+        """Download videos with a pool of browser workers sharing the main login"""
+        stats = {"downloaded": 0, "skipped": 0, "failed": 0, "retried": 0}
+        stats_lock = threading.Lock()
+
+        # Main browser is worker 1, the others get a copy of its login cookies
+        worker_drivers = [driver] + self.start_worker_browsers(driver, num_workers - 1)
+
+        logging.info(f"🚀 Running {len(worker_drivers)} download workers in parallel")
+
+        threads = []
+        for worker_id, worker_driver in enumerate(worker_drivers, 1):
+            thread = threading.Thread(
+                target=self.download_worker,
+                args=(worker_id, worker_driver, scheduler, stats, stats_lock),
+                name=f"download-worker-{worker_id}",
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+
+        try:
+            for thread in threads:
+                thread.join()
+            # Closing a browser would abort its downloads
+            self.wait_for_running_downloads()
+        finally:
+            # Main driver is closed by the caller
+            for worker_driver in worker_drivers[1:]:
+                try:
+                    worker_driver.quit()
+                except:
+                    pass
+
+        return stats
@@ -0,0 +1,115 @@
+"""Pacing of requests to Magisto - token bucket rate limit with AIMD concurrency"""
+import contextlib
+import logging
+import threading
+import time
+
+from .metrics import metrics
+
+# HTTP status codes meaning "slow down"
+THROTTLE_STATUS_CODES = {429, 502, 503, 504}
+
+def throttle_status(error):
+    """HTTP status code of exception if the server asked us to slow down, otherwise None"""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if status in THROTTLE_STATUS_CODES else None
+
+class Governor:
+    """Paces page loads and download starts so Magisto doesn't throttle us
+
+    Every request waits for a free slot (concurrency limit) and a token
+    (rate limit, refilled at `rate` per second, up to `burst` at once).
+    Both limits grow slowly while requests are fast (additive increase) and are
+    halved on congestion - slow responses, timeouts, HTTP 429/5xx, "Page not Found"
+    (multiplicative decrease). At most one decrease per cooldown, because one
+    congestion episode usually fails several requests at once.
+    """
+
+    def __init__(self, max_concurrency=1, rate=1.0, min_rate=0.1, max_rate=10.0, burst=3,
+                 latency_target=8.0, enabled=True):
+        self.enabled = enabled
+        self.max_concurrency = max_concurrency
+        self.limit = 1.0 if max_concurrency > 1 else float(max_concurrency)  # start slow, grow with successes
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.latency_target = latency_target
+        self.cooldown = latency_target  # seconds between two decreases
+        self._tokens = float(burst)
+        self._refilled_at = time.time()
+        self._decreased_at = 0
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold one of the concurrent request slots (and one token) for the duration of the block"""
+        if not self.enabled:
+            yield
+            return
+
+        wait_start = time.time()
+        with self._condition:
+            while self._in_use >= max(1, int(self.limit)):
+                self._condition.wait(1.0)
+            self._in_use += 1
+        try:
+            self.throttle(wait_start)
+            yield
+        finally:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+
+    def throttle(self, wait_start=None):
+        """Wait for a token from the bucket (rate limit only, no slot)"""
+        if not self.enabled:
+            return
+        wait_start = wait_start or time.time()
+        while True:
+            with self._condition:
+                now = time.time()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+        waited = time.time() - wait_start
+        if waited > 0.01:
+            metrics.observe("governor_wait_seconds", waited)
+            metrics.inc("idle_seconds", waited)
+
+    def success(self, latency):
+        """Request finished - grow limits if it was fast, otherwise treat as congestion"""
+        if not self.enabled:
+            return
+        if latency > self.latency_target:
+            self.congestion(f"slow response ({latency:.1f}s)")
+            return
+        with self._condition:
+            # Additive increase - about +1 slot after `limit` fast requests
+            self.limit = min(self.max_concurrency, self.limit + 1 / max(1.0, self.limit))
+            self.rate = min(self.max_rate, self.rate + 0.1)
+            self._condition.notify()
+
+    def congestion(self, reason):
+        """Server is struggling - halve concurrency and rate"""
+        if not self.enabled:
+            return
+        with self._condition:
+            now = time.time()
+            if now - self._decreased_at < self.cooldown:
+                return
+            self._decreased_at = now
+            self.limit = max(1.0, self.limit / 2)
+            self.rate = max(self.min_rate, self.rate / 2)
+            limit, rate = self.limit, self.rate
+        metrics.inc("governor_decreases")
+        logging.info(f"   🐢 Slowing down ({reason}): {int(limit)} parallel, {rate:.2f} requests/s")
+
+    def describe(self):
+        return f"{int(self.limit)} parallel, {self.rate:.2f} requests/s"
@@ -0,0 +1,137 @@
+"""Direct HTTP download of video files (download_mode = "http")"""
+import logging
+import os
+import re
+import time
+import urllib.parse
+
+import requests
+
+from .index import VIDEO_EXTENSIONS
+from .urls import get_video_id_from_url
+
+# Finds media URL of the video page: download link, <video> source or loaded media resource
+FIND_MEDIA_URL_JS = """
+const button = arguments[0];
+const link = button ? button.closest('a[href]') : null;
+if (link && !link.href.startsWith('javascript:') && link.href !== location.href) {
+    return link.href;
+}
+for (const el of document.querySelectorAll('video[src], video source[src]')) {
+    if (el.src && !el.src.startsWith('blob:')) {
+        return el.src;
+    }
+}
+const media = performance.getEntriesByType('resource')
+    .map(entry => entry.name)
+    .filter(name => /\\.(mp4|mov|m4v|webm)(\\?|$)/i.test(name));
+return media.length ? media[media.length - 1] : null;
+"""
+
+def resolve_media_url(driver, download_btn):
+    """Find direct URL of the video file on the loaded video page"""
+    try:
+        media_url = driver.execute_script(FIND_MEDIA_URL_JS, download_btn)
+    except Exception as e:
+        logging.debug(f"   ⚠️ Could not resolve media URL: {e}")
+        return None
+    
+    if media_url and media_url.startswith("http"):
+        return media_url
+    return None
+
+def safe_filename(name):
+    """Only the last part of a file name sent by the server - it must not point outside the download folder
+
+    Leading dots are removed too (hidden files are ignored by the tracker), "" if nothing is left.
+    """
+    name = re.split(r'[\\/]', name)[-1].replace('\0', '').strip().lstrip('.')
+    return name
+
+def get_filename_from_response(response, default_name):
+    """File name from Content-Disposition header or URL path"""
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)", disposition, re.IGNORECASE)
+    if match:
+        name = safe_filename(urllib.parse.unquote(match.group(1).strip().strip('"')))
+        if name:
+            return name
+    match = re.search(r'filename="?([^";]+)"?', disposition, re.IGNORECASE)
+    if match:
+        name = safe_filename(match.group(1))
+        if name:
+            return name
+    
+    url_name = urllib.parse.unquote(os.path.basename(urllib.parse.urlparse(response.url).path))
+    if os.path.splitext(url_name)[1][1:].lower() in VIDEO_EXTENSIONS:
+        return url_name
+    return default_name
+
+def get_unique_path(path):
+    """Add " (1)", " (2)" ... like Chrome does when file already exists"""
+    base, ext = os.path.splitext(path)
+    counter = 1
+    while os.path.exists(path):
+        path = f"{base} ({counter}){ext}"
+        counter += 1
+    return path
+
+def stream_download(session, media_url, video_url, download_dir, config, tracker=None):
+    """Stream media URL into a temp file with Range resume, then rename atomically
+    
+    Returns (final_path, bytes) or raises after config.http_max_retries failed attempts.
+    The tracker is told to ignore the file so it is not taken for a browser download.
+    """
+    video_id = get_video_id_from_url(video_url) or "video"
+    # Temp file name depends only on video ID so an interrupted run can resume it
+    part_path = os.path.join(download_dir, f".{video_id}.part")
+    file_name = None
+    total_size = None
+    
+    for attempt in range(1, config.http_max_retries + 1):
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={resume_from}-"} if resume_from else {}
+        
+        try:
+            with session.get(media_url, headers=headers, stream=True, timeout=config.http_timeout) as response:
+                if response.status_code == 416 and resume_from:
+                    # Nothing left to download - part file is already complete
+                    file_name = file_name or get_filename_from_response(response, f"{video_id}.mp4")
+                    break
+                response.raise_for_status()
+                
+                file_name = get_filename_from_response(response, f"{video_id}.mp4")
+                if response.status_code == 206:
+                    content_range = response.headers.get("Content-Range", "")
+                    if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+                        total_size = int(content_range.rsplit("/", 1)[1])
+                    mode = "ab"
+                    if resume_from:
+                        logging.info(f"     → Resuming download at {resume_from / (1024**2):.1f} MB")
+                else:
+                    # Server ignored Range - start from scratch
+                    content_length = response.headers.get("Content-Length")
+                    total_size = int(content_length) if content_length and content_length.isdigit() else None
+                    mode = "wb"
+                
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=config.http_chunk_size):
+                        if chunk:
+                            f.write(chunk)
+            
+            downloaded = os.path.getsize(part_path)
+            if total_size is None or downloaded >= total_size:
+                break
+            logging.warning(f"     ⚠️ Transfer ended early ({downloaded}/{total_size} bytes)")
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            logging.warning(f"     ⚠️ Transfer interrupted (attempt {attempt}/{config.http_max_retries}): {e}")
+        
+        if attempt == config.http_max_retries:
+            raise IOError(f"download incomplete after {config.http_max_retries} attempts")
+        time.sleep(2 ** attempt)
+    
+    final_path = get_unique_path(os.path.join(download_dir, safe_filename(file_name) or f"{video_id}.mp4"))
+    if tracker:
+        tracker.ignore(os.path.basename(final_path))
+    os.replace(part_path, final_path)
+    return final_path, os.path.getsize(final_path)
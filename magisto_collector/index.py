@@ -0,0 +1,131 @@
+"""In-memory index of downloaded files for skip detection"""
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+
+# Extensions considered as downloaded videos
+VIDEO_EXTENSIONS = ['mp4', 'avi', 'mov', 'mkv', 'wmv', 'webm']
+# Quality suffixes Magisto appends to file names
+QUALITY_SUFFIXES = ['_HD', '_FULL_HD', '_HQ', '_FULL']
+
+def strip_quality_suffixes(name):
+    """Remove Magisto quality suffixes (_FULL_HD, _HD, ...) from file name"""
+    return name.replace('_FULL_HD', '').replace('_HD', '').replace('_HQ', '').replace('_FULL', '')
+
+class DownloadIndex:
+    """In-memory index of the download folder used for fast skip detection
+    
+    The folder (with subfolders of organized layouts) is scanned once at startup,
+    afterwards every lookup is done in memory and new downloads are added as they land.
+    """
+    
+    def __init__(self, download_dir):
+        self.download_dir = download_dir
+        self._lock = threading.Lock()
+        self._by_token = {}       # word in file name (e.g. video ID) -> path
+        self._by_stem = {}        # exact file name without extension -> path
+        self._sorted_stems = []   # sorted (stem, path) for prefix searches
+        self.file_count = 0
+        self.top_level_count = 0  # files directly in download_dir (Magisto's names, not organized)
+    
+    def build(self):
+        """Scan download folder once"""
+        start = time.time()
+        entries = []
+        if os.path.isdir(self.download_dir):
+            folders = [self.download_dir]
+            while folders:
+                with os.scandir(folders.pop()) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_file():
+                            entries.append(entry.path)
+                        elif entry.is_dir():
+                            folders.append(entry.path)
+        
+        with self._lock:
+            self._by_token.clear()
+            self._by_stem.clear()
+            self._sorted_stems = []
+            self.file_count = 0
+            self.top_level_count = 0
+            for path in entries:
+                self._add_locked(path, keep_sorted=False)
+            self._sorted_stems.sort()
+        
+        logging.info(f"📂 Indexed {self.file_count} videos in {time.time() - start:.2f}s")
+    
+    def add(self, path):
+        """Add newly downloaded file to the index"""
+        with self._lock:
+            self._add_locked(path, keep_sorted=True)
+    
+    def _add_locked(self, path, keep_sorted):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        if ext[1:].lower() not in VIDEO_EXTENSIONS or stem in self._by_stem:
+            return
+        
+        self._by_stem[stem] = path
+        for token in re.split(r'[^A-Za-z0-9]+', stem):
+            if token:
+                self._by_token.setdefault(token, path)
+        
+        if keep_sorted:
+            bisect.insort(self._sorted_stems, (stem, path))
+        else:
+            self._sorted_stems.append((stem, path))
+        self.file_count += 1
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.download_dir):
+            self.top_level_count += 1
+    
+    def _with_prefix(self, prefix):
+        """All (stem, path) pairs whose stem starts with prefix"""
+        matches = []
+        position = bisect.bisect_left(self._sorted_stems, (prefix,))
+        while position < len(self._sorted_stems):
+            stem, path = self._sorted_stems[position]
+            if not stem.startswith(prefix):
+                break
+            matches.append((stem, path))
+            position += 1
+        return matches
+    
+    def find_by_video_id(self, video_id):
+        """File containing video ID as a word in its name"""
+        with self._lock:
+            return self._by_token.get(video_id)
+    
+    def find_by_name(self, video_name):
+        """Find file by widget name - returns (path, description of match) or (None, None)"""
+        with self._lock:
+            # Method 3a: Exact match for short names with quality suffix
+            for suffix in [''] + QUALITY_SUFFIXES:
+                path = self._by_stem.get(f"{video_name}{suffix}")
+                if path:
+                    return path, "exact match"
+            
+            # Method 3b: File name starts with full video name (Magisto didn't truncate)
+            matches = self._with_prefix(video_name)
+            if matches:
+                return matches[0][1], "wildcard match"
+            
+            # Method 3c: Magisto truncates long names to ~20 chars and adds _FULL_HD, _HD, etc.
+            if len(video_name) > 20:
+                truncated_name = video_name[:20]
+                for stem, path in self._with_prefix(truncated_name):
+                    if stem.lower().startswith(truncated_name.lower()):
+                        return path, "truncated name (20 chars)"
+            
+            # Method 3d: Flexible truncation (15-25 chars) - shortest prefix covers all lengths
+            if len(video_name) > 15:
+                truncated = video_name[:15]
+                for stem, path in self._with_prefix(truncated):
+                    clean_base = strip_quality_suffixes(stem)
+                    if clean_base.lower().startswith(truncated.lower()) and len(clean_base) <= len(video_name):
+                        return path, "flexible search (truncated)"
+        
+        return None, None
@@ -0,0 +1,250 @@
+"""Verification of downloaded files - content hash, container structure and duplicates"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import metrics
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024  # bytes hashed per step
+# Files below this size are verified in this process - starting a pool would take longer
+POOL_MIN_BYTES = 64 * 1024 * 1024
+
+# Box types every playable MP4/MOV file has
+REQUIRED_BOXES = [b"moov", b"mdat"]
+MOOV_REQUIRED_BOXES = [b"mvhd", b"trak"]
+
+class ContainerError(Exception):
+    pass
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 of file content, read through a memory map (no copies into Python buffers)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mapped) as view:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset:offset + chunk_size])
+    return digest.hexdigest()
+
+def iter_boxes(f, start, end):
+    """Yield (type, payload start, box end) of ISO BMFF boxes between start and end"""
+    offset = start
+    while offset < end:
+        remaining = end - offset
+        f.seek(offset)
+        header = f.read(min(remaining, 16))
+        if remaining < 8:
+            # Some muxers pad the file with zeros
+            if header.strip(b"\0"):
+                raise ContainerError(f"{remaining} stray bytes at offset {offset}")
+            return
+
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                raise ContainerError(f"box header cut off at offset {offset}")
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = remaining  # box extends to end of file
+
+        name = box_type.decode('latin-1')
+        if not all(32 <= c < 127 or c == 0xa9 for c in box_type):
+            raise ContainerError(f"garbage instead of box header at offset {offset}")
+        if size < header_size:
+            raise ContainerError(f"box '{name}' at offset {offset} has invalid size {size}")
+        if size > remaining:
+            raise ContainerError(f"box '{name}' declares {size} bytes but only {remaining} are present (truncated)")
+
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+def check_mp4_structure(path):
+    """Check top-level boxes of MP4/MOV file - returns problem description or None"""
+    try:
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size == 0:
+                return "empty file"
+
+            boxes = {}
+            for box_type, payload_start, box_end in iter_boxes(f, 0, file_size):
+                boxes.setdefault(box_type, (payload_start, box_end))
+
+            missing = [box.decode() for box in REQUIRED_BOXES if box not in boxes]
+            if missing:
+                return f"missing {', '.join(missing)} box"
+
+            mdat_start, mdat_end = boxes[b"mdat"]
+            if mdat_end == mdat_start:
+                return "mdat box is empty"
+
+            moov_start, moov_end = boxes[b"moov"]
+            moov_boxes = {box_type for box_type, _, _ in iter_boxes(f, moov_start, moov_end)}
+            missing = [box.decode() for box in MOOV_REQUIRED_BOXES if box not in moov_boxes]
+            if missing:
+                return f"moov box has no {', '.join(missing)}"
+    except ContainerError as e:
+        return str(e)
+    return None
+
+def check_container(path):
+    """Structure check by file type - returns problem description or None"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.mp4', '.mov', '.m4v'):
+        return check_mp4_structure(path)
+
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        file_size = os.fstat(f.fileno()).st_size
+    if ext in ('.mkv', '.webm'):
+        return None if header.startswith(b"\x1a\x45\xdf\xa3") else "missing EBML header"
+    if ext == '.avi':
+        if header[:4] != b"RIFF" or header[8:12] != b"AVI ":
+            return "missing RIFF AVI header"
+        declared = struct.unpack("<I", header[4:8])[0] + 8
+        if declared > file_size:
+            return f"RIFF declares {declared} bytes but only {file_size} are present (truncated)"
+    return None
+
+def verify_file(path):
+    """Hash file and check its container - runs in worker processes"""
+    start = time.time()
+    result = {"path": path, "size": None, "sha256": None, "problem": None}
+    try:
+        result["size"] = os.path.getsize(path)
+        result["problem"] = check_container(path)
+        result["sha256"] = hash_file(path)
+    except OSError as e:
+        result["problem"] = f"cannot read file: {e}"
+    result["seconds"] = time.time() - start
+    return result
+
+def verify_files(paths, workers=0):
+    """Verify files, large batches in a process pool - yields results in order of paths"""
+    total_bytes = 0
+    for path in paths:
+        try:
+            total_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1 or total_bytes < POOL_MIN_BYTES:
+        yield from map(verify_file, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(verify_file, paths)
+
+def move_aside(path):
+    """Rename broken file so skip detection doesn't find it any more"""
+    broken_path = f"{path}.broken"
+    os.replace(path, broken_path)
+    return broken_path
+
+def is_verified(entry, path):
+    """File was hashed before and hasn't changed since"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return bool(entry["sha256"] and entry["verified_at"] and entry["size"] == stat.st_size and
+                stat.st_mtime <= entry["verified_at"])
+
+def record_result(state_store, video_url, result, other_urls=()):
+    """Store verification result of one file - broken files are moved aside and re-queued
+
+    other_urls are further videos stored with the same file name (fuzzy skip matches).
+    Returns True if the file is fine.
+    """
+    if result["problem"]:
+        logging.warning(f"   ❌ {os.path.basename(result['path'])}: {result['problem']} - will be downloaded again")
+        try:
+            move_aside(result["path"])
+        except OSError as e:
+            logging.warning(f"   ⚠️ Could not rename broken file: {e}")
+        for url in (video_url, *other_urls):
+            state_store.mark_failed(url, f"verify: {result['problem']}")
+        return False
+
+    for url in (video_url, *other_urls):
+        state_store.mark_verified(url, result["sha256"], result["size"])
+    return True
+
+def find_duplicates(entries):
+    """Groups of downloaded files with identical content: {sha256: [entry, ...]} - one entry per file"""
+    by_hash = {}
+    for entry in entries:
+        if entry["sha256"]:
+            by_hash.setdefault(entry["sha256"], {}).setdefault(entry["filename"], entry)
+    return {sha256: list(files.values()) for sha256, files in by_hash.items() if len(files) > 1}
+
+def verify_downloads(config, state_store, rehash=False):
+    """Verify all downloaded videos - broken ones are re-queued, duplicates reported
+
+    Files hashed in previous runs are only hashed again when their size or
+    modification time changed (or with rehash=True).
+    """
+    start = time.time()
+    summary = {"checked": 0, "hashed": 0, "requeued": 0, "duplicates": 0, "duplicate_bytes": 0}
+    entries = state_store.entries("done")
+    summary["checked"] = len(entries)
+
+    to_hash = {}
+    unchanged = 0
+    for entry in entries:
+        path = os.path.join(config.download_dir, entry["filename"] or "")
+        if not entry["filename"] or not os.path.isfile(path):
+            logging.warning(f"   ⚠️ {entry['url']}: file missing - will be downloaded again")
+            state_store.mark_failed(entry["url"], "verify: file missing")
+            summary["requeued"] += 1
+        elif rehash or not is_verified(entry, path):
+            to_hash.setdefault(path, []).append(entry)  # several videos may share one file
+        else:
+            unchanged += 1
+
+    if to_hash:
+        logging.info(f"🔎 Verifying {len(to_hash)} files ({unchanged} unchanged since last check)...")
+
+    hashed_bytes = 0
+    for result in verify_files(list(to_hash), config.verify_workers):
+        group = to_hash[result["path"]]
+        summary["hashed"] += 1
+        hashed_bytes += result["size"] or 0
+        fine = record_result(state_store, group[0]["url"], result, [entry["url"] for entry in group[1:]])
+        for entry in group:
+            entry["sha256"] = result["sha256"] if fine else None
+            if fine:
+                entry["size"] = result["size"]
+        if not fine:
+            summary["requeued"] += len(group)
+
+    for sha256, group in find_duplicates(entries).items():
+        wasted = sum(entry["size"] or 0 for entry in group[1:])
+        summary["duplicates"] += len(group) - 1
+        summary["duplicate_bytes"] += wasted
+        logging.info(f"   👯 Same video saved {len(group)} times ({wasted / (1024**2):.1f} MB extra): "
+                     + ", ".join(entry["filename"] for entry in group))
+
+    elapsed = time.time() - start
+    metrics.observe("verify_seconds", elapsed)
+    metrics.inc("verified_bytes", hashed_bytes)
+    metrics.inc("videos_requeued_by_verify", summary["requeued"])
+    speed_mb = hashed_bytes / (1024**2) / elapsed if elapsed else 0
+    logging.info(f"🔎 Verified {summary['checked']} downloaded videos in {elapsed:.1f}s "
+                 f"({summary['hashed']} hashed, {speed_mb:.0f} MB/s), {summary['requeued']} re-queued for download")
+    if summary["duplicates"]:
+        logging.info(f"   👯 {summary['duplicates']} duplicate files use "
+                     f"{summary['duplicate_bytes'] / (1024**3):.2f} GB")
+    return summary
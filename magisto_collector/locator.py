@@ -0,0 +1,85 @@
+"""Waiting for pages and finding elements with as few browser round trips as possible"""
+import logging
+import time
+
+from .metrics import metrics
+
+LOCATOR_POLL_INTERVAL = 0.25  # seconds between checks while waiting for elements
+
+# Checks all candidate selectors (XPath if starting with "//", otherwise CSS) in one call
+# and returns [candidate index, element, text] of the first match of each candidate
+FIND_FIRST_JS = """
+const [candidates, clickable, exclude] = arguments;
+const isClickable = el => el.getClientRects().length > 0 &&
+    getComputedStyle(el).visibility !== 'hidden' && !el.disabled;
+const found = [];
+for (let i = 0; i < candidates.length; i++) {
+    let elements = [];
+    try {
+        if (candidates[i].startsWith('//')) {
+            const result = document.evaluate(candidates[i], document, null,
+                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let j = 0; j < result.snapshotLength; j++) elements.push(result.snapshotItem(j));
+        } else {
+            elements = document.querySelectorAll(candidates[i]);
+        }
+    } catch (e) {
+        continue;  // invalid selector
+    }
+    for (const el of elements) {
+        if (el === exclude || (clickable && !isClickable(el))) continue;
+        found.push([i, el, (el.innerText || el.textContent || '').trim()]);
+        break;
+    }
+}
+return found;
+"""
+
+def find_first(driver, candidates, timeout=0, clickable=False, exclude=None, accept=None):
+    """Wait for the first of several XPath/CSS candidates to match
+    
+    All candidates are checked together in one browser call, so the worst case
+    is a single timeout instead of one timeout per candidate. When several match,
+    the earlier candidate in the list wins. accept(text) can reject matches by text.
+    Returns (element, winning selector, element text) or (None, None, None).
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            found = driver.execute_script(FIND_FIRST_JS, candidates, clickable, exclude) or []
+        except Exception as e:
+            logging.debug(f"   ⚠️ Locator check failed: {e}")
+            found = []
+        
+        for index, element, text in found:
+            if accept is None or accept(text):
+                logging.debug(f"   → Locator matched: {candidates[index]}")
+                return element, candidates[index], text
+        
+        if time.time() >= deadline:
+            return None, None, None
+        idle_sleep(LOCATOR_POLL_INTERVAL)
+
+def idle_sleep(seconds):
+    """Sleep while waiting for the page - counted as idle time in metrics"""
+    time.sleep(seconds)
+    metrics.inc("idle_seconds", seconds)
+
+def wait_until(condition, timeout):
+    """Poll condition until it returns a true value or timeout expires - returns last value"""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            result = condition()
+        except Exception as e:
+            logging.debug(f"   ⚠️ Wait condition failed: {e}")
+            result = None
+        if result or time.time() >= deadline:
+            return result
+        idle_sleep(LOCATOR_POLL_INTERVAL)
+
+def wait_for_page_ready(driver, timeout):
+    """Wait until the document is parsed (works with normal and eager page loads)"""
+    return wait_until(
+        lambda: driver.execute_script("return document.readyState") in ("interactive", "complete"),
+        timeout)
@@ -0,0 +1,47 @@
+"""Manifest of found videos (JSON lines) and splitting it into shards"""
+import json
+import logging
+import os
+import zlib
+
+from .urls import get_video_id_from_url, is_valid_video_url
+
+def write_manifest(manifest_path, video_urls, video_metadata):
+    """Write found videos with metadata as JSON lines (atomically)"""
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for url in video_urls:
+            record = {"video_id": get_video_id_from_url(url), "url": url}
+            record.update(video_metadata.get(url, {}))
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(temp_path, manifest_path)
+    logging.info(f"📝 Manifest with {len(video_urls)} videos written to {manifest_path}")
+
+def read_manifest(manifest_path):
+    """Video URLs and their metadata from manifest: (video_urls, video_metadata)"""
+    video_urls = []
+    video_metadata = {}
+    seen = set()
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                url = record.pop("url")
+            except (ValueError, KeyError, AttributeError):
+                logging.warning(f"   ⚠️ Manifest line {line_number} is not valid - skipped")
+                continue
+            if url in seen or not is_valid_video_url(url):
+                continue
+            seen.add(url)
+            video_urls.append(url)
+            record.pop("video_id", None)
+            video_metadata[url] = record
+    logging.info(f"📋 Loaded {len(video_urls)} videos from manifest {manifest_path}")
+    return video_urls, video_metadata
+
+def select_shard(video_urls, index, count):
+    """Videos belonging to shard index/count - stable on every computer and run"""
+    return [url for url in video_urls
+            if zlib.crc32(get_video_id_from_url(url).encode('utf-8')) % count == index - 1]
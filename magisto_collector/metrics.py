@@ -0,0 +1,126 @@
+"""Timing metrics of a run - JSON summary and Prometheus textfile"""
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+class RunMetrics:
+    """Counters and histograms of one run, exported as JSON summary and Prometheus textfile"""
+
+    # Histogram buckets - seconds for durations, bytes/s for throughput
+    TIME_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800]
+    THROUGHPUT_BUCKETS = [2**17, 2**18, 2**19, 2**20, 2**21, 2**22, 2**23, 2**24, 2**25, 2**26]
+
+    def __init__(self, json_file="", prom_file="", export_interval=60):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self.json_file = json_file
+        self.prom_file = prom_file
+        self.export_interval = export_interval
+        self._export_thread = None
+        self._stop_export = threading.Event()
+
+    def configure(self, json_file="", prom_file="", export_interval=60):
+        """Set output files - the run is measured from here"""
+        self.json_file = json_file
+        self.prom_file = prom_file
+        self.export_interval = export_interval
+        self.started_at = time.time()
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value, buckets=None):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {
+                    "buckets": buckets or self.TIME_BUCKETS, "values": []}
+            histogram["values"].append(value)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Measure duration of a block into histogram <name>"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - start)
+
+    def summary(self):
+        with self._lock:
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                values = sorted(histogram["values"])
+                count = len(values)
+                histograms[name] = {
+                    "count": count,
+                    "sum": round(sum(values), 3),
+                    "avg": round(sum(values) / count, 3),
+                    "min": round(values[0], 3),
+                    "p50": round(values[count // 2], 3),
+                    "p95": round(values[min(count - 1, int(count * 0.95))], 3),
+                    "max": round(values[-1], 3),
+                }
+            return {
+                "started_at": self.started_at,
+                "updated_at": time.time(),
+                "elapsed_seconds": round(time.time() - self.started_at, 3),
+                "counters": dict(self.counters),
+                "histograms": histograms,
+            }
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            lines.append("# TYPE magisto_run_elapsed_seconds gauge")
+            lines.append(f"magisto_run_elapsed_seconds {time.time() - self.started_at:.3f}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE magisto_{name}_total counter")
+                lines.append(f"magisto_{name}_total {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                values = histogram["values"]
+                lines.append(f"# TYPE magisto_{name} histogram")
+                for bound in histogram["buckets"]:
+                    lines.append(f'magisto_{name}_bucket{{le="{bound}"}} {sum(1 for v in values if v <= bound)}')
+                lines.append(f'magisto_{name}_bucket{{le="+Inf"}} {len(values)}')
+                lines.append(f"magisto_{name}_sum {sum(values):.3f}")
+                lines.append(f"magisto_{name}_count {len(values)}")
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Write metrics files (atomically, readers never see half-written file)"""
+        outputs = []
+        if self.json_file:
+            outputs.append((self.json_file, json.dumps(self.summary(), indent=2)))
+        if self.prom_file:
+            outputs.append((self.prom_file, self.prometheus_text()))
+
+        for path, content in outputs:
+            try:
+                temp_path = f"{path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+            except Exception as e:
+                logging.warning(f"Could not write metrics to {path}: {e}")
+
+    def start_periodic_export(self):
+        def run():
+            while not self._stop_export.wait(self.export_interval):
+                self.export()
+        self._export_thread = threading.Thread(target=run, name="metrics-export", daemon=True)
+        self._export_thread.start()
+
+    def stop(self):
+        """Stop periodic export and write final metrics"""
+        self._stop_export.set()
+        self.export()
+
+# Metrics of the current run, shared by all modules (nothing is written until configured)
+metrics = RunMetrics()
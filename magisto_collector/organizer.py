@@ -0,0 +1,172 @@
+"""Canonical file names and sharded folder layout of downloaded videos
+
+Magisto names downloads after the video title, often cut to ~20 characters plus
+_FULL_HD / _HD, so finding a video again needs fuzzy name searches. Organized
+downloads are named "{video_id}_{title}.{ext}" and live in subfolders:
+
+    flat      - Magisto's names directly in download_dir (no organizing)
+    id_prefix - first two characters of video ID, e.g. p1/P14WY1NQHDE9VQNhCzE_Summer_trip.mp4
+    month     - month the video was created (download month if unknown), e.g. 2019-07/...
+
+Every file then contains its video ID and no folder holds more than a few
+hundred files, even with 50k+ videos.
+"""
+import datetime
+import logging
+import os
+import re
+import time
+
+from .index import VIDEO_EXTENSIONS, strip_quality_suffixes
+
+# Characters not allowed in file names on Windows / macOS / Linux and whitespace
+UNSAFE_CHARACTERS = re.compile(r'[\s<>:"/\\|?*\x00-\x1f]+')
+
+def sanitize_title(title, max_length=60):
+    """Title usable in file names on every system - words joined by "_", at most max_length chars"""
+    if not title:
+        return ""
+    title = UNSAFE_CHARACTERS.sub("_", title.strip())
+    title = re.sub(r'_+', "_", title)[:max_length]
+    return title.strip("._-")
+
+def canonical_name(video_id, title, ext, max_length=60):
+    """File name "{video_id}_{title}.{ext}" (just "{video_id}.{ext}" without usable title)"""
+    title = sanitize_title(title, max_length)
+    ext = ext.lstrip(".").lower()
+    return f"{video_id}_{title}.{ext}" if title else f"{video_id}.{ext}"
+
+def created_month(created):
+    """"YYYY-MM" of creation date from listing metadata (ISO date or Unix time), None if unknown"""
+    if isinstance(created, str) and re.fullmatch(r'\d{9,}(\.\d+)?', created.strip()):
+        created = float(created)  # Unix time read back from the catalog's text column
+    if isinstance(created, (int, float)) and created > 0:
+        if created > 1e11:  # milliseconds
+            created /= 1000
+        return time.strftime("%Y-%m", time.localtime(created))
+    if isinstance(created, str):
+        match = re.match(r'(\d{4})-(\d{2})', created)
+        if match:
+            return f"{match.group(1)}-{match.group(2)}"
+    return None
+
+def shard_directory(layout, video_id, created=None, file_path=None):
+    """Subfolder of download_dir for video (relative), "" in flat layout"""
+    if layout == "id_prefix":
+        return video_id[:2].lower()
+    if layout == "month":
+        month = created_month(created)
+        if not month and file_path:
+            month = datetime.date.fromtimestamp(os.path.getmtime(file_path)).strftime("%Y-%m")
+        return month or "unknown"
+    return ""
+
+def organized_path(config, video_id, file_path, title=None, created=None):
+    """Canonical path of downloaded file - title taken from file name if not known"""
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    if not title:
+        title = strip_quality_suffixes(stem)
+        if title.startswith(video_id):
+            title = title[len(video_id):]
+    name = canonical_name(video_id, title, ext, config.organize_title_length)
+    folder = shard_directory(config.file_layout, video_id, created, file_path)
+    return os.path.join(config.download_dir, folder, name)
+
+def is_organized(config, video_id, file_path):
+    """File already has its canonical name in the right folder (any title)"""
+    relative = os.path.relpath(file_path, config.download_dir)
+    folder, name = os.path.split(relative)
+    return bool(folder) and (name.startswith(f"{video_id}_") or name.startswith(f"{video_id}."))
+
+def move_without_overwrite(source, target):
+    """Rename source to target - raises FileExistsError instead of replacing an existing file"""
+    try:
+        os.link(source, target)  # fails atomically if target exists
+    except FileExistsError:
+        raise
+    except OSError:
+        # File system without hard links (FAT, some network shares) - check right before renaming
+        if os.path.exists(target):
+            raise FileExistsError(target)
+        os.replace(source, target)
+        return
+    os.unlink(source)
+
+def organize_file(config, video_id, file_path, title=None, created=None):
+    """Rename file to its canonical path - returns new path (old one if nothing was done)
+
+    The rename is atomic (same file system), an existing file is never overwritten.
+    """
+    if config.file_layout == "flat" or not video_id or is_organized(config, video_id, file_path):
+        return file_path
+
+    target = organized_path(config, video_id, file_path, title, created)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        move_without_overwrite(file_path, target)
+    except FileExistsError:
+        logging.warning(f"   ⚠️ {os.path.relpath(target, config.download_dir)} already exists - "
+                        f"keeping {os.path.basename(file_path)}")
+        return file_path
+    return target
+
+def organize_existing(config, state_store, dry_run=False):
+    """Move downloads of earlier runs to the organized layout - returns number of moved files
+
+    Files are matched to videos through the state database (file name stored at download)
+    or the video ID in the file name. Files of unknown videos stay where they are.
+    Title and creation date come from the catalog when the library was crawled.
+    """
+    from .download import is_video_title
+
+    if config.file_layout == "flat" or not os.path.isdir(config.download_dir):
+        return 0
+
+    start = time.time()
+    by_filename = {}
+    video_ids = {}
+    for entry in state_store.entries("done"):
+        if entry["filename"]:
+            by_filename[entry["filename"]] = entry
+        if entry["video_id"]:
+            video_ids[entry["video_id"]] = entry
+
+    catalog = state_store.catalog_entries()
+    moved = unknown = 0
+    with os.scandir(config.download_dir) as it:
+        files = [entry.path for entry in it
+                 if entry.is_file() and os.path.splitext(entry.name)[1][1:].lower() in VIDEO_EXTENSIONS]
+
+    for path in sorted(files):
+        name = os.path.basename(path)
+        entry = by_filename.get(name)
+        if entry is None:
+            tokens = re.split(r'[^A-Za-z0-9]+', os.path.splitext(name)[0])
+            entry = next((video_ids[token] for token in tokens if token in video_ids), None)
+        if entry is None:
+            unknown += 1
+            continue
+
+        metadata = catalog.get(entry["url"], {})
+        title = metadata.get("title") if is_video_title(metadata.get("title")) else None
+        created = metadata.get("created")
+
+        if dry_run:
+            target = organized_path(config, entry["video_id"], path, title, created)
+            logging.info(f"   📦 {name} -> {os.path.relpath(target, config.download_dir)}")
+            moved += 1
+            continue
+
+        try:
+            new_path = organize_file(config, entry["video_id"], path, title, created)
+        except OSError as e:
+            logging.warning(f"   ⚠️ Could not move {name}: {e}")
+            continue
+        if new_path != path:
+            state_store.mark_moved(entry["url"], new_path)
+            moved += 1
+
+    action = "Would move" if dry_run else "Moved"
+    logging.info(f"📦 {action} {moved} files into '{config.file_layout}' layout in {time.time() - start:.1f}s"
+                 + (f" ({unknown} files of unknown videos left in place)" if unknown else ""))
+    return moved
@@ -0,0 +1,269 @@
+"""Overlapping crawl and download - stages connected by bounded asyncio queues
+
+    discover -> check -> download -> completion -> verify
+
+discover   reads video URLs from the crawl (or manifest / state database)
+check      drops duplicates, other shards and dead-letter videos, skips downloaded videos
+download   loads the video page and starts the download in a leased browser
+completion collects downloads finished by the browser (or HTTP mode)
+verify     hashes and checks finished files in a process pool
+
+Browser calls block, so they run in executor threads; the event loop only moves
+work between stages. Bounded queues keep a fast stage from running far ahead
+of a slow one, and downloads start while the library is still being crawled.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .integrity import record_result, verify_file
+from .manifest import select_shard
+from .metrics import metrics
+from .retry import DRIVER_CRASH, record_failure
+
+DONE = object()  # end of stream marker passed through queues
+
+class NoBrowserLeft(Exception):
+    pass
+
+class DriverLease:
+    """Browser lent to one stage for one video - set driver to its replacement after a crash"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+class DriverPool:
+    """Browsers shared by the download workers
+
+    The crawl browser joins the pool as soon as discovery is finished.
+    """
+
+    def __init__(self, drivers=()):
+        self._idle = asyncio.Queue()
+        self.size = 0
+        for driver in drivers:
+            self.add(driver)
+
+    def add(self, driver):
+        self._idle.put_nowait(driver)
+        self.size += 1
+
+    @contextlib.asynccontextmanager
+    async def lease(self, waiting_for_more=lambda: False):
+        while True:
+            if self.size == 0 and not waiting_for_more():
+                raise NoBrowserLeft("no browser left")
+            try:
+                driver = await asyncio.wait_for(self._idle.get(), 1.0)
+                break
+            except asyncio.TimeoutError:
+                continue
+
+        lease = DriverLease(driver)
+        try:
+            yield lease
+        finally:
+            if lease.driver is not None:
+                self._idle.put_nowait(lease.driver)
+            else:
+                self.size -= 1  # crashed browser could not be replaced
+
+class DownloadPipeline:
+    """Crawl, download and verify at the same time"""
+
+    def __init__(self, config, state_store, downloader, shard=None, skip_urls=()):
+        self.config = config
+        self.state_store = state_store
+        self.downloader = downloader
+        self.shard = shard
+        self.skip_urls = set(skip_urls)
+        self.queue_size = config.pipeline_queue_size
+        self.stats = {"downloaded": 0, "skipped": 0, "failed": 0, "retried": 0, "verified": 0, "broken": 0}
+        self.discovered = 0
+        self.discovery_done = False
+        self.outstanding = 0  # videos in download stage or waiting for retry
+        self.started_at = None
+        self.first_download_at = None
+
+    async def run(self, video_source, drivers, crawl_driver=None):
+        """Process all videos from video_source (blocking iterable) - returns stats
+
+        crawl_driver is used by video_source and joins the download browsers when discovery ends.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.started_at = time.time()
+        self.threads = ThreadPoolExecutor(max_workers=len(drivers) + 3, thread_name_prefix="pipeline")
+        self.pool = DriverPool(drivers)
+        self.check_queue = asyncio.Queue(self.queue_size)
+        self.download_queue = asyncio.Queue(self.queue_size)
+        self.completed_queue = asyncio.Queue()  # filled from tracker thread - can't wait for space
+        self.verify_queue = asyncio.Queue(self.queue_size)
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+        def on_complete(ticket):
+            self.loop.call_soon_threadsafe(self.completed_queue.put_nowait, ticket)
+        self.downloader.completion_listeners.append(on_complete)
+
+        num_workers = len(drivers) + (1 if crawl_driver else 0)
+        logging.info(f"🚀 Pipeline started: {num_workers} download workers, queues of {self.queue_size}")
+        try:
+            verify_task = asyncio.create_task(self.verify_stage())
+            completion_task = asyncio.create_task(self.completion_stage())
+            discover_task = asyncio.create_task(self.discover_stage(video_source, crawl_driver))
+            check_task = asyncio.create_task(self.check_stage())
+            workers = [asyncio.create_task(self.download_stage(worker_id)) for worker_id in range(1, num_workers + 1)]
+
+            await discover_task
+            await check_task
+            # Retries can still come back - stop workers only when nothing is left
+            await self.idle.wait()
+            for _ in workers:
+                await self.download_queue.put(DONE)
+            await asyncio.gather(*workers)
+
+            # Closing a browser would abort its downloads
+            unfinished = await self.loop.run_in_executor(self.threads, self.downloader.wait_for_running_downloads)
+            self.stats["unfinished"] = unfinished
+            self.completed_queue.put_nowait(DONE)
+            await completion_task
+            await verify_task
+        finally:
+            self.downloader.completion_listeners.remove(on_complete)
+            self.threads.shutdown(wait=False)
+
+        metrics.observe("pipeline_seconds", time.time() - self.started_at)
+        return self.stats
+
+    async def discover_stage(self, video_source, crawl_driver):
+        iterator = iter(video_source)
+        try:
+            while True:
+                url = await self.loop.run_in_executor(self.threads, next, iterator, DONE)
+                if url is DONE:
+                    break
+                await self.check_queue.put(url)
+        except Exception as e:
+            logging.error(f"❌ Discovery failed: {e} - continuing with videos found so far")
+        finally:
+            self.discovery_done = True
+            await self.check_queue.put(DONE)
+            if crawl_driver is not None:
+                self.pool.add(crawl_driver)
+                logging.info("   👷 Crawl browser joined the download workers")
+
+    async def check_stage(self):
+        seen = set()
+        while True:
+            url = await self.check_queue.get()
+            if url is DONE:
+                break
+            if url in seen or url in self.skip_urls:
+                continue
+            seen.add(url)
+            if self.shard and not select_shard([url], *self.shard):
+                continue
+
+            self.discovered += 1
+            self.state_store.add_discovered([url])
+            already_downloaded, existing_file = self.downloader.is_video_already_downloaded(url)
+            if already_downloaded:
+                logging.info(f"[4/5] ({self.discovered}) ⏭️  SKIPPING - already downloaded: {os.path.basename(existing_file)}")
+                self.state_store.mark_done(url, existing_file)
+                self.stats["skipped"] += 1
+                metrics.inc("videos_skipped")
+                continue
+
+            self.outstanding += 1
+            self.idle.clear()
+            await self.download_queue.put((url, 1, self.discovered))
+
+    def finish_video(self):
+        self.outstanding -= 1
+        if self.outstanding == 0:
+            self.idle.set()
+
+    async def download_stage(self, worker_id):
+        while True:
+            item = await self.download_queue.get()
+            if item is DONE:
+                break
+            url, attempt, video_index = item
+
+            try:
+                async with self.pool.lease(lambda: not self.discovery_done) as lease:
+                    result, failure = await self.loop.run_in_executor(
+                        self.threads, self.downloader.process_video, lease.driver, url, video_index,
+                        self.discovered)
+                    if failure is not None and failure.error_class == DRIVER_CRASH:
+                        lease.driver = await self.loop.run_in_executor(
+                            self.threads, self.downloader.replace_driver, lease.driver)
+            except NoBrowserLeft:
+                logging.error(f"   ❌ Worker {worker_id} stopped - no browser left, remaining videos are left for the next run")
+                self.finish_video()
+                continue
+
+            if failure is None:
+                if result == "downloaded" and self.first_download_at is None:
+                    self.first_download_at = time.time()
+                    metrics.observe("time_to_first_download_seconds", self.first_download_at - self.started_at)
+                    logging.info(f"   ⏱️  First download started {self.first_download_at - self.started_at:.1f}s after start")
+                self.stats[result] += 1
+                self.finish_video()
+                continue
+
+            delay = record_failure(self.state_store, url, attempt, failure, self.config.retry_max_attempts,
+                                   self.config.retry_base_delay, self.config.retry_max_delay)
+            if delay is None:
+                self.stats["failed"] += 1
+                self.finish_video()
+            else:
+                self.stats["retried"] += 1
+                asyncio.create_task(self.retry_later((url, attempt + 1, video_index), delay))
+
+    async def retry_later(self, item, delay):
+        await asyncio.sleep(delay)
+        await self.download_queue.put(item)
+
+    async def completion_stage(self):
+        while True:
+            ticket = await self.completed_queue.get()
+            if ticket is DONE:
+                break
+            if ticket.file_path:
+                await self.verify_queue.put(ticket)
+        await self.verify_queue.put(DONE)
+
+    async def verify_stage(self):
+        if not self.config.verify_downloads:
+            while await self.verify_queue.get() is not DONE:
+                pass
+            return
+
+        workers = self.config.verify_workers or os.cpu_count() or 1
+        running = set()
+        limit = asyncio.Semaphore(workers)
+        with ProcessPoolExecutor(max_workers=workers) as processes:
+            async def verify(ticket):
+                try:
+                    result = await self.loop.run_in_executor(processes, verify_file, ticket.file_path)
+                    if record_result(self.state_store, ticket.video_url, result):
+                        self.stats["verified"] += 1
+                    else:
+                        self.stats["broken"] += 1
+                finally:
+                    limit.release()
+
+            while True:
+                ticket = await self.verify_queue.get()
+                if ticket is DONE:
+                    break
+                await limit.acquire()
+                task = asyncio.create_task(verify(ticket))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running)
@@ -0,0 +1,236 @@
+"""Quality policy - which rendition to download and how many bytes the archive will take
+
+Policies (quality_policy setting):
+    first       - just confirm the download dialog (as before, no rendition detection)
+    highest     - highest resolution offered
+    hd_max      - highest resolution up to 720p (HD) - about half the size of Full HD
+    budget:NGB  - highest resolution that keeps the whole download folder within N GB
+                  (MB and TB work too); the remaining budget is shared by the videos still to download
+
+Sizes come from the dialog ("1080p (120 MB)"), HEAD requests of rendition links or,
+as a last resort, the video duration from the catalog and a typical bitrate.
+"""
+import logging
+import re
+import threading
+
+from .metrics import metrics
+
+# Quality options in the download dialog - innermost clickable elements whose text looks like
+# a resolution or quality name. The dialog is the one around arguments[0] (its confirmation button);
+# without a dialog there is nothing to choose from - the rest of the page is never searched.
+# "starts" tells links, buttons and menu items (download right away) from options that only
+# select a quality (list items, labels, radios) - those still need the confirmation button.
+FIND_RENDITIONS_JS = """
+const dialogs = "[role='dialog'], .modal, .popup, .dialog, [class*='modal'], [class*='dialog']";
+const pattern = /\\b(\\d{3,4}p|4k|uhd|full[ _-]?hd|fhd|hd|sd|hq|lq|high|medium|low)\\b/i;
+const candidates = "button, a, li, label, [role='menuitem'], [role='option'], [role='radio']";
+const root = (arguments[0] && arguments[0].closest(dialogs)) || document.querySelector(dialogs);
+const triggers = "a[href], [download], [role='menuitem'], " +
+                 "button:not([aria-pressed]):not([aria-checked]):not([role='radio']):not([role='option'])";
+const options = [];
+if (!root) return options;
+for (const el of root.querySelectorAll(candidates)) {
+    const text = (el.innerText || el.getAttribute('aria-label') || '').trim();
+    if (!text || text.length > 80 || !pattern.test(text) || el.getClientRects().length === 0) continue;
+    if (el.querySelector(candidates)) continue;  // the inner element is the option
+    options.push({element: el, text: text.replace(/\\s+/g, ' '),
+                  href: el.href || el.getAttribute('data-href') || el.getAttribute('data-url') || null,
+                  size: el.getAttribute('data-size') || el.getAttribute('data-filesize') || null,
+                  starts: el.matches(triggers)});
+}
+return options;
+"""
+
+HD_HEIGHT = 720
+
+# Height of renditions named instead of numbered (checked in this order)
+LABEL_HEIGHTS = [
+    (r'\b(4k|uhd)\b', 2160),
+    (r'\b(full[ _-]?hd|fhd)\b', 1080),
+    (r'\b(hd|hq|high)\b', 720),
+    (r'\b(sd|medium)\b', 480),
+    (r'\b(lq|low)\b', 360),
+]
+
+# Typical bitrate of Magisto renditions in bytes per second - size estimate from duration
+BYTES_PER_SECOND = {2160: 5_000_000, 1440: 2_000_000, 1080: 1_000_000, 720: 600_000, 480: 300_000, 360: 150_000}
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+SIZE_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*(KB|MB|GB|TB)\b', re.IGNORECASE)
+BUDGET_PATTERN = re.compile(r'budget:(\d+(?:\.\d+)?)\s*(MB|GB|TB)?$', re.IGNORECASE)
+
+def parse_height(label):
+    """Vertical resolution of rendition label ("1080p", "Full HD", ...), None if unknown"""
+    match = re.search(r'\b(\d{3,4})p\b', label, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+    for pattern, height in LABEL_HEIGHTS:
+        if re.search(pattern, label, re.IGNORECASE):
+            return height
+    return None
+
+def parse_size(text):
+    """Bytes of size shown on page ("120 MB", "1,2 GB" or plain number of bytes), None if not found"""
+    if not text:
+        return None
+    text = str(text).strip()
+    if text.isdigit():
+        return int(text)
+    match = SIZE_PATTERN.search(text)
+    if not match:
+        return None
+    return int(float(match.group(1).replace(',', '.')) * SIZE_UNITS[match.group(2).upper()])
+
+def parse_policy(policy):
+    """(policy name, budget in bytes or None) - raises ValueError for unknown policies"""
+    policy = policy.strip().lower()
+    if policy in ("first", "highest", "hd_max"):
+        return policy, None
+    match = BUDGET_PATTERN.match(policy)
+    if match:
+        return "budget", int(float(match.group(1)) * SIZE_UNITS[(match.group(2) or "GB").upper()])
+    raise ValueError(f"Unknown quality policy '{policy}' (use first, highest, hd_max or budget:<N>GB)")
+
+def format_size(size):
+    return f"{size / (1024**2):.1f} MB" if size is not None else "size unknown"
+
+class Rendition:
+    """One quality option of the download dialog"""
+
+    def __init__(self, element, label, href=None, size=None, starts_download=True):
+        self.element = element
+        self.label = label
+        self.href = href
+        self.starts_download = starts_download  # False: option only selects, dialog must be confirmed
+        self.height = parse_height(label)
+        self.size = size if size is not None else parse_size(label)
+        self.size_source = "page" if self.size is not None else None
+
+    def estimate(self, duration):
+        """Size estimate from duration (seconds) and typical bitrate of this height"""
+        if self.size is not None or not duration or not self.height:
+            return
+        try:
+            seconds = float(duration)
+        except (TypeError, ValueError):
+            return  # no usable duration - size stays unknown
+        height = min(BYTES_PER_SECOND, key=lambda known: abs(known - self.height))
+        self.size = int(seconds * BYTES_PER_SECOND[height])
+        self.size_source = "estimate"
+
+def find_renditions(driver, confirmation_btn=None):
+    """Quality options of the open download dialog - only those with a recognizable resolution"""
+    try:
+        options = driver.execute_script(FIND_RENDITIONS_JS, confirmation_btn) or []
+    except Exception as e:
+        logging.debug(f"   ⚠️ Could not read quality options: {e}")
+        return []
+
+    renditions = []
+    seen_labels = set()
+    for option in options:
+        if option["text"] in seen_labels:
+            continue
+        seen_labels.add(option["text"])
+        rendition = Rendition(option["element"], option["text"], option.get("href"), parse_size(option.get("size")),
+                              option.get("starts", True))
+        if rendition.height:
+            renditions.append(rendition)
+    return renditions
+
+def head_size(session, url, timeout=30):
+    """Content-Length of URL from HEAD request, None if the server doesn't say"""
+    try:
+        response = session.head(url, allow_redirects=True, timeout=timeout)
+        metrics.inc("quality_head_requests")
+        length = response.headers.get("Content-Length")
+        if response.ok and length and length.isdigit():
+            return int(length)
+    except Exception as e:
+        logging.debug(f"   ⚠️ HEAD {url} failed: {e}")
+    return None
+
+class QualityPolicy:
+    """Chooses renditions and keeps the books of projected and actual bytes
+
+    start() is given the bytes already in the download folder and the number of
+    videos still to download - a budget is shared equally by the remaining videos,
+    so savings on small videos leave more for the following ones.
+    """
+
+    def __init__(self, policy="first"):
+        self.name, self.budget = parse_policy(policy)
+        self._lock = threading.Lock()
+        self.used_bytes = 0        # download folder + projected bytes of chosen renditions
+        self.remaining_videos = 0
+        self.projected = {}        # video URL -> projected bytes of chosen rendition
+        self.projected_bytes = 0   # of finished downloads with known projection
+        self.actual_bytes = 0      # of the same downloads
+        self.downloaded_bytes = 0  # of all finished downloads
+        self.budget_exceeded = False
+
+    @property
+    def needs_sizes(self):
+        return self.name == "budget"
+
+    def start(self, used_bytes, pending_videos):
+        self.used_bytes = used_bytes
+        self.remaining_videos = pending_videos
+        if self.budget:
+            logging.info(f"📐 Quality budget {self.budget / (1024**3):.1f} GB: {used_bytes / (1024**3):.2f} GB used, "
+                         f"{pending_videos} videos to download")
+
+    def allowance(self):
+        """Bytes available for the next video within the budget"""
+        return (self.budget - self.used_bytes) / max(1, self.remaining_videos)
+
+    def choose(self, renditions):
+        """Rendition to download according to the policy"""
+        by_height = sorted(renditions, key=lambda rendition: (rendition.height, rendition.size or 0), reverse=True)
+        if self.name == "first":
+            return renditions[0]
+        if self.name == "highest":
+            return by_height[0]
+        if self.name == "hd_max":
+            return next((rendition for rendition in by_height if rendition.height <= HD_HEIGHT), by_height[-1])
+
+        with self._lock:
+            allowance = self.allowance()
+        fitting = [rendition for rendition in by_height if rendition.size is not None and rendition.size <= allowance]
+        if fitting:
+            return fitting[0]
+        # Nothing fits - take the smallest one rather than leave the video out
+        if not self.budget_exceeded:
+            self.budget_exceeded = True
+            logging.warning(f"   ⚠️ Quality budget exhausted ({allowance / (1024**2):.1f} MB left per video) - "
+                            f"downloading the smallest renditions from now on")
+        known = [rendition for rendition in by_height if rendition.size is not None]
+        return min(known, key=lambda rendition: rendition.size) if known else by_height[-1]
+
+    def record_choice(self, video_url, rendition):
+        with self._lock:
+            self.remaining_videos = max(0, self.remaining_videos - 1)
+            if rendition is not None and rendition.size is not None:
+                self.projected[video_url] = rendition.size
+                self.used_bytes += rendition.size
+
+    def record_actual(self, video_url, size):
+        """Download finished - returns its projected bytes (None if unknown)"""
+        with self._lock:
+            projected = self.projected.pop(video_url, None)
+            self.downloaded_bytes += size
+            if projected is None:
+                self.used_bytes += size
+            else:
+                self.used_bytes += size - projected
+                self.projected_bytes += projected
+                self.actual_bytes += size
+        return projected
+
+    def summary(self):
+        """Projected vs actual bytes of finished downloads"""
+        with self._lock:
+            return {"policy": self.name, "budget": self.budget, "used_bytes": self.used_bytes,
+                    "projected_bytes": self.projected_bytes, "actual_bytes": self.actual_bytes,
+                    "downloaded_bytes": self.downloaded_bytes}
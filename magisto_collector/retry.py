@@ -0,0 +1,112 @@
+"""Retrying failed videos - failure classes, backoff and the dead-letter list"""
+import collections
+import heapq
+import logging
+import random
+import threading
+import time
+
+from .locator import idle_sleep
+
+# Failure classes (stored in state database as error_class)
+NO_BUTTON = "no_button"                # video page loaded, but no Download button
+PAGE_NOT_FOUND = "page_not_found"      # Magisto shows "Page not Found" - video is gone
+DRIVER_CRASH = "driver_crash"          # browser or ChromeDriver died
+DOWNLOAD_STALLED = "download_stalled"  # download didn't finish in time
+TIMEOUT = "timeout"                    # page or element didn't load in time
+ERROR = "error"                        # anything else
+
+# Retrying these doesn't help - they go to the dead-letter list right away
+PERMANENT_FAILURES = {PAGE_NOT_FOUND}
+
+class VideoFailure(Exception):
+    """Failed video with its failure class"""
+
+    def __init__(self, error_class, message):
+        super().__init__(message)
+        self.error_class = error_class
+
+    @property
+    def permanent(self):
+        return self.error_class in PERMANENT_FAILURES
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Exponential backoff with jitter - between half and full delay, so retries don't come in waves"""
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return random.uniform(delay / 2, delay)
+
+def record_failure(state_store, url, attempt, failure, max_attempts, base_delay, max_delay):
+    """Store failed attempt - returns delay before the next attempt, None if video went to dead-letter list"""
+    if not failure.permanent and attempt < max_attempts:
+        delay = backoff_delay(attempt, base_delay, max_delay)
+        state_store.mark_failed(url, failure, failure.error_class)
+        logging.info(f"     🔁 {failure.error_class}: retry {attempt + 1}/{max_attempts} in {delay:.0f}s")
+        return delay
+
+    state_store.mark_dead(url, failure, failure.error_class)
+    reason = "permanent failure" if failure.permanent else f"failed {attempt} times"
+    logging.warning(f"     💀 {failure.error_class}: {reason} - moved to dead-letter list")
+    return None
+
+class RetryScheduler:
+    """Hands out videos to download workers - retries that are due first, otherwise fresh videos
+
+    Failed videos come back after a backoff delay, interleaved with fresh work.
+    After max_attempts (or a permanent failure) they are moved to the dead-letter list
+    (status "dead" in state database) and can be re-run alone with "download --dead-letter".
+    """
+
+    def __init__(self, video_urls, state_store, max_attempts=3, base_delay=20, max_delay=300):
+        self.state_store = state_store
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total = len(video_urls)
+        self.index = {url: idx for idx, url in enumerate(video_urls, 1)}  # position for log messages
+        self._fresh = collections.deque(video_urls)
+        self._retries = []  # heap of (due time, sequence, url, attempt)
+        self._sequence = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.retried = 0
+        self.dead = 0
+
+    def next_item(self):
+        """(url, attempt) to process next, None when all work is done
+
+        Waits for the next retry when nothing else is left - another worker's
+        failure may still add a retry as long as videos are in progress.
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                if self._retries and self._retries[0][0] <= now:
+                    _, _, url, attempt = heapq.heappop(self._retries)
+                    self._in_flight += 1
+                    return url, attempt
+                if self._fresh:
+                    self._in_flight += 1
+                    return self._fresh.popleft(), 1
+                if not self._retries and not self._in_flight:
+                    return None
+                wait = self._retries[0][0] - now if self._retries else 1.0
+            idle_sleep(min(wait, 1.0))
+
+    def succeeded(self, url):
+        with self._lock:
+            self._in_flight -= 1
+
+    def failed(self, url, attempt, failure):
+        """Schedule retry or move video to dead-letter list - returns True if it will be retried"""
+        delay = record_failure(self.state_store, url, attempt, failure, self.max_attempts,
+                               self.base_delay, self.max_delay)
+        retry = delay is not None
+        with self._lock:
+            self._in_flight -= 1
+            if retry:
+                self._sequence += 1
+                heapq.heappush(self._retries, (time.time() + delay, self._sequence, url, attempt + 1))
+                self.retried += 1
+            else:
+                self.dead += 1
+        return retry
@@ -0,0 +1,267 @@
+"""SQLite database with download state of every video"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .urls import get_video_id_from_url
+
+class StateStore:
+    """SQLite database with download state of every video (replaces download_mapping.txt)
+    
+    Status of video: "discovered" -> "downloading" -> "done" / "failed" (will be retried)
+    / "dead" (dead-letter list - permanent failure or out of retries, re-run alone).
+    Writes are batched into transactions of commit_every changes.
+    Verified downloads also have content hash (sha256) and time of verification.
+    File names are stored relative to files_dir (download folder, may include subfolders).
+    The catalog table keeps title, duration, creation date and thumbnail of every video
+    found in library listings.
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS videos (
+        url TEXT PRIMARY KEY,
+        video_id TEXT,
+        status TEXT NOT NULL DEFAULT 'discovered',
+        filename TEXT,
+        size INTEGER,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        discovered_at REAL,
+        updated_at REAL,
+        sha256 TEXT,
+        verified_at REAL,
+        error_class TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_videos_video_id ON videos(video_id);
+    CREATE INDEX IF NOT EXISTS idx_videos_status ON videos(status);
+    CREATE TABLE IF NOT EXISTS catalog (
+        url TEXT PRIMARY KEY,
+        video_id TEXT,
+        title TEXT,
+        duration REAL,
+        created TEXT,
+        thumbnail_url TEXT,
+        thumbnail_file TEXT,
+        updated_at REAL
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+    
+    # Columns added after the first version - added to older databases on open
+    ADDED_COLUMNS = [("sha256", "TEXT"), ("verified_at", "REAL"), ("error_class", "TEXT")]
+    
+    def __init__(self, db_path, commit_every=20, files_dir=None):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.files_dir = files_dir or os.path.dirname(db_path)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pending_writes = 0
+    
+    def open(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        # Sharded runs on one computer share the database - wait for the other writers
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(videos)")}
+        for name, column_type in self.ADDED_COLUMNS:
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE videos ADD COLUMN {name} {column_type}")
+        self._conn.commit()
+    
+    def close(self):
+        if self._conn:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+    
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending_writes = 0
+    
+    def _write(self, sql, params=()):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._pending_writes += 1
+            if self._pending_writes >= self.commit_every:
+                self._conn.commit()
+                self._pending_writes = 0
+    
+    def migrate_mapping_file(self, mapping_file):
+        """Import old download_mapping.txt on first run"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'mapping_migrated'").fetchone()
+        if row or not os.path.exists(mapping_file):
+            return 0
+        
+        now = time.time()
+        rows = []
+        try:
+            with open(mapping_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if '|' in line:
+                        saved_url, saved_file = line.strip().split('|', 1)
+                        rows.append((saved_url, get_video_id_from_url(saved_url), saved_file, now, now))
+        except Exception as e:
+            logging.warning(f"Could not read mapping file: {e}")
+            return 0
+        
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO videos (url, video_id, status, filename, discovered_at, updated_at)
+                       VALUES (?, ?, 'done', ?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET status = 'done', filename = excluded.filename""",
+                    rows)
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('mapping_migrated', ?)", (str(now),))
+        logging.info(f"📦 Migrated {len(rows)} entries from {os.path.basename(mapping_file)}")
+        return len(rows)
+    
+    def add_discovered(self, video_urls):
+        """Remember found videos (existing entries keep their status)"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO videos (url, video_id, discovered_at, updated_at) VALUES (?, ?, ?, ?)",
+                    [(url, get_video_id_from_url(url), now, now) for url in video_urls])
+    
+    def update_catalog(self, video_metadata):
+        """Store metadata from library listing {url: {"title", "duration", "created", "thumbnail"}}
+        
+        Values missing in this listing keep what earlier listings found.
+        """
+        now = time.time()
+        rows = []
+        for url, metadata in video_metadata.items():
+            thumbnail = metadata.get("thumbnail")
+            rows.append((url, get_video_id_from_url(url), metadata.get("title"), metadata.get("duration"),
+                         metadata.get("created"), thumbnail if isinstance(thumbnail, str) else None, now))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO catalog (url, video_id, title, duration, created, thumbnail_url, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET title = COALESCE(excluded.title, title),
+                           duration = COALESCE(excluded.duration, duration),
+                           created = COALESCE(excluded.created, created),
+                           thumbnail_url = COALESCE(excluded.thumbnail_url, thumbnail_url),
+                           updated_at = excluded.updated_at""",
+                    rows)
+    
+    def set_thumbnail_file(self, video_url, file_path):
+        self._write("UPDATE catalog SET thumbnail_file = ? WHERE url = ?", (self.relative_name(file_path), video_url))
+    
+    def catalog_entries(self):
+        """Catalog of the library: {url: {"title", "duration", "created", "thumbnail_url", ...}}"""
+        with self._lock:
+            return {row["url"]: dict(row) for row in self._conn.execute("SELECT * FROM catalog")}
+    
+    def catalog_counts(self):
+        """(videos in catalog, videos with saved thumbnail)"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), COUNT(thumbnail_file) FROM catalog").fetchone()
+    
+    def get(self, video_url):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM videos WHERE url = ?", (video_url,)).fetchone()
+        return dict(row) if row else None
+    
+    def mark_downloading(self, video_url):
+        self._write("""INSERT INTO videos (url, video_id, status, attempts, discovered_at, updated_at)
+                       VALUES (?, ?, 'downloading', 1, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET status = 'downloading',
+                           attempts = attempts + 1, updated_at = excluded.updated_at""",
+                    (video_url, get_video_id_from_url(video_url), time.time(), time.time()))
+    
+    def mark_done(self, video_url, file_path):
+        """Video is downloaded - verification is kept when file name and size are unchanged (e.g. skipped video)"""
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = None
+        self._write("""INSERT INTO videos (url, video_id, status, filename, size, discovered_at, updated_at)
+                       VALUES (?, ?, 'done', ?, ?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET status = 'done', filename = excluded.filename,
+                           size = excluded.size, last_error = NULL, error_class = NULL,
+                           updated_at = excluded.updated_at,
+                           sha256 = CASE WHEN filename IS excluded.filename AND size IS excluded.size
+                                         THEN sha256 END,
+                           verified_at = CASE WHEN filename IS excluded.filename AND size IS excluded.size
+                                              THEN verified_at END""",
+                    (video_url, get_video_id_from_url(video_url), self.relative_name(file_path), size,
+                     time.time(), time.time()))
+    
+    def mark_moved(self, video_url, file_path):
+        """File of downloaded video was renamed - content (and its hash) stays the same"""
+        self._write("UPDATE videos SET filename = ?, updated_at = ? WHERE url = ?",
+                    (self.relative_name(file_path), time.time(), video_url))
+    
+    def relative_name(self, file_path):
+        """File name stored in database - path inside files_dir, only the name for files elsewhere"""
+        relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.files_dir))
+        if relative.startswith(os.pardir):
+            return os.path.basename(file_path)
+        return relative
+    
+    def mark_verified(self, video_url, sha256, size):
+        self._write("UPDATE videos SET sha256 = ?, size = ?, verified_at = ? WHERE url = ?",
+                    (sha256, size, time.time(), video_url))
+    
+    def mark_failed(self, video_url, error, error_class=None, status="failed"):
+        self._write("""INSERT INTO videos (url, video_id, status, last_error, error_class, discovered_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET status = excluded.status, last_error = excluded.last_error,
+                           error_class = excluded.error_class, updated_at = excluded.updated_at""",
+                    (video_url, get_video_id_from_url(video_url), status, str(error), error_class,
+                     time.time(), time.time()))
+    
+    def mark_dead(self, video_url, error, error_class=None):
+        """Move video to dead-letter list - skipped by normal runs"""
+        self.mark_failed(video_url, error, error_class, status="dead")
+    
+    def known_urls(self):
+        """All video URLs seen in previous runs"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT url FROM videos")}
+    
+    def pending_urls(self):
+        """Known videos that are not downloaded yet (without dead-letter list)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT url FROM videos WHERE status NOT IN ('done', 'dead') ORDER BY discovered_at")]
+    
+    def done_bytes(self):
+        """Total size of downloaded videos"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM videos WHERE status = 'done'").fetchone()[0]
+    
+    def status_counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM videos GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def entries(self, status):
+        """All videos with given status, oldest first"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                "SELECT * FROM videos WHERE status = ? ORDER BY discovered_at", (status,))]
+
+    def resume_order(self, video_urls):
+        """Videos interrupted in previous run first, then the rest in original order"""
+        with self._lock:
+            interrupted = {row[0] for row in self._conn.execute(
+                "SELECT url FROM videos WHERE status = 'downloading'")}
+        if interrupted:
+            logging.info(f"🔁 Resuming {len(interrupted)} videos interrupted in previous run")
+        return ([url for url in video_urls if url in interrupted] +
+                [url for url in video_urls if url not in interrupted])
@@ -0,0 +1,199 @@
+"""Follow browser downloads in the download folder until they finish"""
+import logging
+import os
+import threading
+import time
+
+from .index import VIDEO_EXTENSIONS
+
+class DownloadTicket:
+    """One clicked download followed by DownloadTracker"""
+    
+    def __init__(self, video_url):
+        self.video_url = video_url
+        self.clicked_at = time.time()
+        self.partial_name = None    # .crdownload file while Chrome is downloading
+        self.file_path = None       # final file once download finished
+        self.bytes = 0
+        self.completed_at = None
+        self.started = threading.Event()
+        self.completed = threading.Event()
+    
+    @property
+    def duration(self):
+        return (self.completed_at or time.time()) - self.clicked_at
+    
+    @property
+    def throughput(self):
+        """Bytes per second of finished download"""
+        return self.bytes / self.duration if self.duration > 0 else 0
+
+class DownloadTracker:
+    """Follow Chrome downloads in the download folder until they really finish
+    
+    Chrome writes into "<name>.crdownload" (first as "Unconfirmed <n>.crdownload")
+    and renames it to the final name when the download is complete. The tracker
+    polls the folder in a background thread and matches appearing files to
+    clicked downloads in click order. Callers must not click the next download
+    before the previous one started (or expired) - a new file is credited to
+    the ticket without a file, which is only unambiguous if there is one.
+    """
+    
+    PARTIAL_SUFFIXES = ('.crdownload', '.part', '.tmp')
+    
+    def __init__(self, download_dir, on_complete=None, poll_interval=0.5):
+        self.download_dir = download_dir
+        self.on_complete = on_complete
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._active = []           # tickets in click order
+        self._previous = {}         # file name -> size at last poll
+        self._ignored = set()       # files written by the script itself
+        self._stop = threading.Event()
+        self._thread = None
+        self.completed_count = 0
+    
+    def start(self):
+        self._previous = self._scan()
+        self._thread = threading.Thread(target=self._run, name="download-tracker", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+    
+    def begin(self, video_url):
+        """Register download just before clicking its button"""
+        ticket = DownloadTicket(video_url)
+        with self._lock:
+            self._active.append(ticket)
+        return ticket
+    
+    def cancel(self, ticket):
+        """Forget download that was never triggered"""
+        with self._lock:
+            if ticket in self._active:
+                self._active.remove(ticket)
+    
+    def expire(self, ticket):
+        """Forget download that didn't start in time so it can't claim files of later downloads
+        
+        Returns False if it started just now after all.
+        """
+        with self._lock:
+            if ticket.started.is_set():
+                return False
+            if ticket in self._active:
+                self._active.remove(ticket)
+            return True
+    
+    def ignore(self, file_name):
+        """Do not match this file to a browser download (written by http mode)"""
+        with self._lock:
+            self._ignored.add(file_name)
+    
+    def complete_external(self, ticket):
+        """Report download finished outside of Chrome"""
+        self.completed_count += 1
+        ticket.started.set()
+        ticket.completed.set()
+        if self.on_complete:
+            self.on_complete(ticket)
+    
+    def running_count(self):
+        with self._lock:
+            return len(self._active)
+    
+    def wait_started(self, ticket, timeout):
+        return ticket.started.wait(timeout)
+    
+    def wait_all(self, timeout):
+        """Wait for all running downloads, return tickets that did not finish"""
+        deadline = time.time() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._active)
+            if not pending or time.time() >= deadline:
+                return pending
+            pending[0].completed.wait(min(5, max(0, deadline - time.time())))
+    
+    def _is_partial(self, name):
+        return name.endswith(self.PARTIAL_SUFFIXES)
+    
+    def _scan(self):
+        files = {}
+        try:
+            with os.scandir(self.download_dir) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.startswith('.'):
+                        try:
+                            files[entry.name] = entry.stat().st_size
+                        except OSError:
+                            continue
+        except OSError as e:
+            logging.debug(f"   ⚠️ Cannot scan download folder: {e}")
+        return files
+    
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._poll()
+            except Exception as e:
+                logging.warning(f"   ⚠️ Download tracker error: {e}")
+    
+    def _poll(self):
+        current = self._scan()
+        appeared = sorted(set(current) - set(self._previous))
+        vanished = set(self._previous) - set(current)
+        finished = []
+        
+        with self._lock:
+            # Tickets whose partial file disappeared were renamed or finished
+            renamed = [t for t in self._active if t.partial_name in vanished]
+            
+            for name in appeared:
+                if name in self._ignored:
+                    continue
+                if self._is_partial(name):
+                    waiting = next((t for t in self._active if t.partial_name is None), None)
+                    # "Unconfirmed <n>.crdownload" is a new download, a named one usually a rename
+                    if name.startswith("Unconfirmed ") and waiting:
+                        ticket = waiting
+                    else:
+                        ticket = renamed.pop(0) if renamed else waiting
+                    if ticket:
+                        ticket.partial_name = name
+                        ticket.started.set()
+                    continue
+                
+                if os.path.splitext(name)[1][1:].lower() not in VIDEO_EXTENSIONS:
+                    continue
+                
+                ticket = next((t for t in self._active
+                               if t.partial_name and t.partial_name.startswith(name)), None)
+                if not ticket and renamed:
+                    ticket = renamed.pop(0)
+                if not ticket:
+                    # Small file finished between two polls
+                    ticket = next((t for t in self._active if t.partial_name is None), None)
+                if ticket:
+                    ticket.file_path = os.path.join(self.download_dir, name)
+                    ticket.bytes = current[name]
+                    ticket.completed_at = time.time()
+                    ticket.started.set()
+                    self._active.remove(ticket)
+                    finished.append(ticket)
+            
+            # Progress of running downloads
+            for ticket in self._active:
+                if ticket.partial_name in current:
+                    ticket.bytes = current[ticket.partial_name]
+        
+        self._previous = current
+        
+        for ticket in finished:
+            self.completed_count += 1
+            ticket.completed.set()
+            if self.on_complete:
+                self.on_complete(ticket)
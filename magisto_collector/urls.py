@@ -0,0 +1,21 @@
+"""Video URL helpers"""
+
+def get_video_id_from_url(video_url):
+    """Extract video ID from URL for identifying downloaded files"""
+    try:
+        # e.g. https://www.magisto.com/video/P14WY1NQHDE9VQNhCzE -> P14WY1NQHDE9VQNhCzE
+        return video_url.split('/')[-1]
+    except:
+        return None
+
+def is_video_link(href):
+    """Check if URL contains video identifier and is NOT main page"""
+    return (any(pattern in href for pattern in ['/video/', '/movie/', '/watch/', '/view/']) and
+            not any(excluded in href for excluded in ['/video/mine', '/my-movies', '/videos', '/dashboard']) and
+            len(href.split('/')[-1]) > 3)  # Minimum ID length
+
+def is_valid_video_url(url):
+    """Check if URL looks like individual video"""
+    return (url.count('/') >= 4 and  # Minimum URL structure
+            not any(excluded in url for excluded in ['/mine', '/my-movies', '/videos', '/dashboard']) and
+            len(url.split('/')[-1]) >= 5)  # Video ID has at least 5 characters